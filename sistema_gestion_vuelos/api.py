@@ -1,15 +1,47 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, Query, status
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from modelos import SesionLocal, Vuelo
+from modelos import SesionLocal, Vuelo, inicializar_base_de_datos
 from gestor_vuelos import GestorVuelos
-from pydantic import BaseModel, field_validator
+from gestor_referencias import GestorReferencias
+from cache_referencias import CacheReferencias
+from colas_vuelos import ColasPorOrigen
+from escritura_agrupada import EscritorAgrupado
+from archivador_vuelos import ArchivadorVuelos
+from bloqueo_proceso import BloqueoProceso, ruta_bloqueo_por_defecto
+from exportador_vuelos import exportar_vuelos, filtrar_vuelos, iterar_vuelos_db
+from estadisticas_vuelos import ContadoresVuelos, numpy_disponible
+from configuracion import Configuracion
+from validador_vuelos import ValidadorVuelos
+from pydantic import BaseModel, field_validator, model_validator
 
 class RespuestaConteo(BaseModel):
     total: int
 
-class CrearVuelo(BaseModel):
+class RespuestaEstadisticas(BaseModel):
+    total: int
+    por_estado: Dict[str, int]
+    por_aerolinea: Dict[str, int]
+    por_ruta: Dict[str, int]
+    por_hora: Dict[int, int]
+
+class TasaRetraso(BaseModel):
+    aerolinea: str
+    hora: int
+    tasa_retraso: float
+
+def _validar_campo(resultado):
+    """Convierte el resultado (valido, mensaje) del validador en un error de Pydantic"""
+    valido, mensaje = resultado
+    if not valido:
+        raise ValueError(mensaje)
+
+class DatosVuelo(BaseModel):
     numero_vuelo: str
     aerolinea: str
     origen: str
@@ -17,23 +49,30 @@ class CrearVuelo(BaseModel):
     hora_programada: datetime
     es_emergencia: bool = False
     estado: str = "programado"
-    
+
+class CrearVuelo(DatosVuelo):
     @field_validator('numero_vuelo')
     @classmethod
     def validar_numero_vuelo(cls, v):
-        # Validación de formato básico (2 letras seguidas de 3-4 números)
-        import re
-        if not re.match(r'^[A-Z]{2}\d{3,4}$', v):
-            raise ValueError('Número de vuelo inválido. Debe tener formato: XX999 o XX9999')
+        _validar_campo(ValidadorVuelos.validar_numero_vuelo(v))
         return v
     
     @field_validator('estado')
     @classmethod
     def validar_estado(cls, v):
-        estados_validos = ["programado", "abordando", "despegado", "retrasado", "cancelado"]
-        if v not in estados_validos:
-            raise ValueError(f'Estado inválido. Debe ser uno de: {", ".join(estados_validos)}')
+        _validar_campo(ValidadorVuelos.validar_estado(v))
+        return v
+    
+    @field_validator('hora_programada')
+    @classmethod
+    def validar_hora_programada(cls, v):
+        _validar_campo(ValidadorVuelos.validar_hora_programada(v))
         return v
+    
+    @model_validator(mode='after')
+    def validar_origen_destino(self):
+        _validar_campo(ValidadorVuelos.validar_origen_destino(self.origen, self.destino))
+        return self
 
 class ActualizarVuelo(BaseModel):
     numero_vuelo: Optional[str] = None
@@ -48,19 +87,50 @@ class ActualizarVuelo(BaseModel):
     @classmethod
     def validar_numero_vuelo(cls, v):
         if v is not None:
-            import re
-            if not re.match(r'^[A-Z]{2}\d{3,4}$', v):
-                raise ValueError('Número de vuelo inválido. Debe tener formato: XX999 o XX9999')
+            _validar_campo(ValidadorVuelos.validar_numero_vuelo(v))
         return v
     
     @field_validator('estado')
     @classmethod
     def validar_estado(cls, v):
         if v is not None:
-            estados_validos = ["programado", "abordando", "despegado", "retrasado", "cancelado"]
-            if v not in estados_validos:
-                raise ValueError(f'Estado inválido. Debe ser uno de: {", ".join(estados_validos)}')
+            _validar_campo(ValidadorVuelos.validar_estado(v))
+        return v
+    
+    @field_validator('hora_programada')
+    @classmethod
+    def validar_hora_programada(cls, v):
+        if v is not None:
+            _validar_campo(ValidadorVuelos.validar_hora_programada(v))
+        return v
+    
+    @field_validator('origen', 'destino')
+    @classmethod
+    def validar_codigo_aeropuerto(cls, v, info):
+        if v is not None:
+            _validar_campo(ValidadorVuelos.validar_codigo_aeropuerto(v, info.field_name))
+        return v
+class MovimientoVuelo(BaseModel):
+    id_vuelo: int
+    posicion: int
+
+class ReordenarCola(BaseModel):
+    origen: str
+    movimientos: Optional[List[MovimientoVuelo]] = None
+    orden: Optional[List[int]] = None
+    
+    @field_validator('origen')
+    @classmethod
+    def validar_origen(cls, v):
+        _validar_campo(ValidadorVuelos.validar_codigo_aeropuerto(v))
         return v
+    
+    @model_validator(mode='after')
+    def validar_modo(self):
+        if (self.movimientos is None) == (self.orden is None):
+            raise ValueError("Debe indicar movimientos u orden (solo uno de los dos)")
+        return self
+
 class RespuestaVuelo(BaseModel):
     id: int
     numero_vuelo: str
@@ -74,16 +144,171 @@ class RespuestaVuelo(BaseModel):
     class Config:
         from_attributes = True
 
+class RespuestaVueloArchivado(RespuestaVuelo):
+    id_original: int
+    fecha_archivo: datetime
+
+class RespuestaVueloEnriquecida(RespuestaVuelo):
+    nombre_aerolinea: Optional[str] = None
+    ciudad_origen: Optional[str] = None
+    pais_origen: Optional[str] = None
+    ciudad_destino: Optional[str] = None
+    pais_destino: Optional[str] = None
+
+class CrearAerolinea(BaseModel):
+    codigo: str
+    nombre: str
+    pais_origen: str
+    logo_url: Optional[str] = None
+    
+    @field_validator('codigo')
+    @classmethod
+    def validar_codigo(cls, v):
+        _validar_campo(ValidadorVuelos.validar_codigo_aerolinea(v))
+        return v
+
+class ActualizarAerolinea(BaseModel):
+    nombre: Optional[str] = None
+    pais_origen: Optional[str] = None
+    logo_url: Optional[str] = None
+
+class RespuestaAerolinea(BaseModel):
+    id: int
+    codigo: str
+    nombre: str
+    pais_origen: str
+    logo_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class CrearAeropuerto(BaseModel):
+    codigo_iata: str
+    nombre: str
+    ciudad: str
+    pais: str
+    
+    @field_validator('codigo_iata')
+    @classmethod
+    def validar_codigo_iata(cls, v):
+        _validar_campo(ValidadorVuelos.validar_codigo_aeropuerto(v, "aeropuerto"))
+        return v
+
+class ActualizarAeropuerto(BaseModel):
+    nombre: Optional[str] = None
+    ciudad: Optional[str] = None
+    pais: Optional[str] = None
+
+class RespuestaAeropuerto(BaseModel):
+    id: int
+    codigo_iata: str
+    nombre: str
+    ciudad: str
+    pais: str
+
+    class Config:
+        from_attributes = True
+
 class MensajeRespuesta(BaseModel):
     mensaje: str
 
+class ErrorFilaLote(BaseModel):
+    indice: int
+    errores: List[str]
+
+class EstadoPreparacion(BaseModel):
+    listo: bool
+    detalle: Optional[str] = None
+
+logger = logging.getLogger("vuelos_app")
+
+# Estado de preparación del proceso: pasa a listo cuando termina el precalentamiento
+estado_preparacion = {"listo": False, "detalle": "Precalentando"}
+
+def precalentar():
+    """Carga la caché de referencias, las colas de vuelos y los contadores"""
+    db = SesionLocal()
+    try:
+        cache_referencias.precargar(db)
+        GestorVuelos(db, cache_referencias, contadores_vuelos, colas_vuelos)
+        estado_preparacion.update(listo=True, detalle=None)
+        logger.info("Precalentamiento completado")
+        # El archivador empieza con las colas ya cargadas para poder retirar de ellas lo archivado
+        if archivador_vuelos is not None:
+            archivador_vuelos.iniciar()
+    except Exception as e:
+        estado_preparacion.update(listo=False, detalle=f"Error en el precalentamiento: {e}")
+        logger.error(f"Error en el precalentamiento: {e}")
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    # Un segundo proceso (p. ej. uvicorn --workers N) falla aquí y no llega a arrancar
+    bloqueo_proceso.adquirir()
+    try:
+        # El esquema se crea antes de aceptar peticiones; el precalentamiento sigue en
+        # segundo plano y /salud/listo informa cuando ha terminado
+        inicializar_base_de_datos()
+        if escritor_agrupado is not None:
+            escritor_agrupado.iniciar()
+        tarea_precalentamiento = asyncio.create_task(asyncio.to_thread(precalentar))
+        yield
+        await tarea_precalentamiento
+        estado_preparacion.update(listo=False, detalle="Apagando")
+        if archivador_vuelos is not None:
+            await asyncio.to_thread(archivador_vuelos.detener)
+        if escritor_agrupado is not None:
+            await asyncio.to_thread(escritor_agrupado.detener)
+    finally:
+        bloqueo_proceso.liberar()
+
 # Inicializar FastAPI
 app = FastAPI(
     title="Sistema de Gestión de Vuelos", 
     description="API REST para la gestión de vuelos en aeropuertos usando una lista doblemente enlazada",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=ciclo_de_vida
 )
 
+# Un único proceso servidor por base de datos (ver BloqueoProceso)
+bloqueo_proceso = BloqueoProceso(
+    Configuracion.ARCHIVO_BLOQUEO or ruta_bloqueo_por_defecto(Configuracion.DATABASE_URL)
+)
+
+# Caché de aerolíneas y aeropuertos compartida por todas las peticiones del proceso
+cache_referencias = CacheReferencias(Configuracion.CACHE_REFERENCIAS_TAMANIO_MAXIMO)
+
+# Contadores agregados de vuelos, actualizados por el gestor en cada escritura
+contadores_vuelos = ContadoresVuelos()
+
+# Colas de vuelos por aeropuerto de origen, compartidas por todas las peticiones del proceso
+colas_vuelos = ColasPorOrigen()
+
+# Escritor único para el commit agrupado de vuelos (desactivado por defecto)
+escritor_agrupado = EscritorAgrupado(
+    SesionLocal,
+    max_operaciones=Configuracion.COMMIT_AGRUPADO_MAX_OPERACIONES,
+    espera_ms=Configuracion.COMMIT_AGRUPADO_ESPERA_MS
+) if Configuracion.COMMIT_AGRUPADO else None
+
+def retirar_vuelos_archivados(vuelos):
+    """Retira de las colas y contadores compartidos los vuelos movidos al archivo"""
+    db = SesionLocal()
+    try:
+        GestorVuelos(db, cache_referencias, contadores_vuelos, colas_vuelos).retirar_archivados(vuelos)
+    finally:
+        db.close()
+
+# Archivado periódico de vuelos despegados y cancelados antiguos
+archivador_vuelos = ArchivadorVuelos(
+    SesionLocal,
+    retencion_horas=Configuracion.ARCHIVO_RETENCION_HORAS,
+    tamanio_lote=Configuracion.ARCHIVO_TAMANIO_LOTE,
+    intervalo_segundos=Configuracion.ARCHIVO_INTERVALO_SEGUNDOS,
+    al_archivar=retirar_vuelos_archivados
+) if Configuracion.ARCHIVO_ACTIVO else None
+
 # Dependencia para obtener la sesión de la base de datos
 def obtener_db():
     db = SesionLocal()
@@ -94,7 +319,32 @@ def obtener_db():
     
 # Dependencia para obtener el gestor de vuelos
 def obtener_gestor_vuelos(db: Session = Depends(obtener_db)):
-    return GestorVuelos(db)
+    return GestorVuelos(db, cache_referencias, contadores_vuelos, colas_vuelos, escritor_agrupado)
+
+# Dependencia para obtener el gestor de aerolíneas y aeropuertos
+def obtener_gestor_referencias(db: Session = Depends(obtener_db)):
+    return GestorReferencias(db, cache_referencias)
+
+def _verificar_referencias(datos_vuelo, gestor):
+    """Comprueba origen, destino y aerolínea (los campos presentes) contra las tablas de referencia"""
+    codigos_aeropuerto, codigos_aerolinea = gestor.obtener_codigos_referencia()
+    valido, errores = ValidadorVuelos.validar_referencias(datos_vuelo, codigos_aeropuerto, codigos_aerolinea)
+    if not valido:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errores)
+@app.get("/salud", response_model=EstadoPreparacion,
+         summary="Comprobación de vida",
+         description="Responde mientras el proceso está en marcha, aunque no haya terminado el precalentamiento.")
+def comprobar_salud():
+    return {"listo": estado_preparacion["listo"]}
+
+@app.get("/salud/listo", response_model=EstadoPreparacion,
+         summary="Comprobación de preparación",
+         description="Retorna 200 cuando las colas y la caché están cargadas, o 503 mientras se precalientan.")
+def comprobar_preparacion():
+    if not estado_preparacion["listo"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=dict(estado_preparacion))
+    return estado_preparacion
+
 @app.post("/vuelos/", response_model=RespuestaVuelo, status_code=status.HTTP_201_CREATED, 
          summary="Crear un nuevo vuelo",
          description="Añade un nuevo vuelo al sistema. Los vuelos de emergencia se colocan al inicio de la lista.")
@@ -106,26 +356,115 @@ def crear_vuelo(vuelo: CrearVuelo, gestor: GestorVuelos = Depends(obtener_gestor
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Ya existe un vuelo con el número {vuelo.numero_vuelo}"
         )
+    _verificar_referencias(vuelo.dict(), gestor)
     return gestor.agregar_vuelo(vuelo.dict())
 
-@app.get("/vuelos/", response_model=List[RespuestaVuelo],
+@app.post("/vuelos/lote", response_model=List[RespuestaVuelo], status_code=status.HTTP_201_CREATED,
+         summary="Crear vuelos en lote",
+         description="Valida y añade un lote de vuelos en una sola transacción. Si alguna fila es inválida "
+                     "no se inserta ninguna y se retornan los errores por fila.")
+def crear_vuelos_en_lote(vuelos: List[DatosVuelo], gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
+    registros = [vuelo.dict() for vuelo in vuelos]
+    codigos_aeropuerto, codigos_aerolinea = gestor.obtener_codigos_referencia()
+    numeros_existentes = gestor.obtener_numeros_existentes({r['numero_vuelo'] for r in registros})
+    errores = ValidadorVuelos.validar_lote(registros, codigos_aeropuerto, codigos_aerolinea, numeros_existentes)
+    if errores:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[ErrorFilaLote(indice=indice, errores=mensajes).dict() for indice, mensajes in sorted(errores.items())]
+        )
+    return gestor.agregar_vuelos_en_lote(registros)
+
+@app.get("/vuelos/", response_model=List[RespuestaVueloEnriquecida], response_model_exclude_none=True,
         summary="Obtener todos los vuelos",
-        description="Retorna una lista con todos los vuelos en el sistema.")
+        description="Retorna una lista con todos los vuelos en el sistema, o solo la cola de un aeropuerto "
+                    "de origen. Con enriquecer=true cada vuelo incluye el nombre de la aerolínea y la "
+                    "ciudad/país de origen y destino.")
 def leer_vuelos(
     skip: int = Query(0, description="Número de registros a saltar (para paginación)"),
     limit: int = Query(100, description="Número máximo de registros a retornar"),
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
+    enriquecer: bool = Query(False, description="Incluir datos de aerolínea y aeropuertos"),
     gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
 ):
-    vuelos = gestor.obtener_todos_los_vuelos()
-    return vuelos[skip:skip+limit]
+    vuelos = gestor.obtener_todos_los_vuelos(origen)[skip:skip+limit]
+    if enriquecer:
+        return gestor.enriquecer_vuelos(vuelos)
+    return vuelos
 
 @app.get("/vuelos/total", response_model=RespuestaConteo,
          summary="Total de vuelos",
-         description="Retorna el número total de vuelos en el sistema.")
-def obtener_total_vuelos(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    valor = gestor.longitud()
-    print(f"Valor: {valor}, Tipo: {type(valor)}")
-    return {"total": valor}
+         description="Retorna el número total de vuelos en el sistema (o de un origen), incluidos los cancelados "
+                     "que no están en las colas: la misma población que las estadísticas.")
+def obtener_total_vuelos(
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    return {"total": gestor.contar_vuelos(origen)}
+
+@app.get("/vuelos/estadisticas", response_model=RespuestaEstadisticas,
+         summary="Estadísticas de vuelos",
+         description="Retorna los conteos de vuelos por estado, aerolínea, ruta y hora de salida, "
+                     "incluidos los cancelados.")
+def obtener_estadisticas(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
+    return gestor.obtener_estadisticas()
+
+@app.get("/vuelos/estadisticas/retrasos", response_model=List[TasaRetraso],
+         summary="Tasa de retrasos por aerolínea y hora",
+         description="Retorna la proporción de vuelos retrasados por aerolínea y hora de salida "
+                     "calculada sobre una instantánea columnar de todo el programa, incluidos los cancelados "
+                     "(requiere NumPy).")
+def obtener_tasa_retrasos(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
+    if not numpy_disponible():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="NumPy no está instalado")
+    instantanea = gestor.obtener_instantanea_columnar()
+    tasas = instantanea.tasa_por("retrasado", "aerolinea", "hora")
+    return [
+        {"aerolinea": aerolinea, "hora": hora, "tasa_retraso": tasa}
+        for (aerolinea, hora), tasa in sorted(tasas.items())
+    ]
+
+@app.get("/vuelos/exportar",
+         summary="Exportar vuelos",
+         description="Descarga los vuelos como NDJSON o CSV en streaming, con memoria constante. "
+                     "Con fuente=cola se recorren las colas en orden; con fuente=db se lee la base de datos "
+                     "por bloques. Opcionalmente filtra por origen, destino, estado o aerolínea y comprime en gzip.")
+def exportar(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato de salida: ndjson o csv"),
+    fuente: str = Query("cola", pattern="^(cola|db)$", description="Origen de los datos: cola o db"),
+    origen: Optional[str] = None,
+    destino: Optional[str] = None,
+    estado: Optional[str] = None,
+    aerolinea: Optional[str] = None,
+    comprimir: bool = Query(False, description="Comprimir la respuesta con gzip"),
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    filtros = {"origen": origen, "destino": destino, "estado": estado, "aerolinea": aerolinea}
+    if fuente == "db":
+        vuelos = iterar_vuelos_db(filtros)
+    else:
+        vuelos = filtrar_vuelos(gestor.iterar_vuelos(origen), filtros)
+    
+    fragmentos, tipo_contenido, extension = exportar_vuelos(vuelos, formato, comprimir)
+    cabeceras = {"Content-Disposition": f'attachment; filename="vuelos.{extension}"'}
+    if comprimir:
+        cabeceras["Content-Encoding"] = "gzip"
+    return StreamingResponse(fragmentos, media_type=tipo_contenido, headers=cabeceras)
+
+@app.get("/vuelos/archivados", response_model=List[RespuestaVueloArchivado],
+         summary="Consultar vuelos archivados",
+         description="Retorna los vuelos despegados o cancelados que se movieron al archivo, "
+                     "los más recientes primero. Se puede filtrar por número de vuelo, origen o estado. "
+                     "id identifica el registro archivado; id_original es el ID que tenía el vuelo.")
+def leer_vuelos_archivados(
+    skip: int = Query(0, description="Número de registros a saltar (para paginación)"),
+    limit: int = Query(100, description="Número máximo de registros a retornar"),
+    numero_vuelo: Optional[str] = None,
+    origen: Optional[str] = None,
+    estado: Optional[str] = None,
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    return gestor.obtener_vuelos_archivados(skip, limit, numero_vuelo, origen, estado)
 
 @app.get("/vuelos/{id_vuelo}", response_model=RespuestaVuelo,
          summary="Obtener un vuelo por ID",
@@ -140,7 +479,20 @@ def leer_vuelo(id_vuelo: int, gestor: GestorVuelos = Depends(obtener_gestor_vuel
          summary="Actualizar un vuelo",
          description="Actualiza la información de un vuelo existente.")
 def actualizar_vuelo(id_vuelo: int, vuelo: ActualizarVuelo, gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    vuelo_actualizado = gestor.actualizar_vuelo(id_vuelo, vuelo.dict(exclude_unset=True))
+    datos_vuelo = vuelo.dict(exclude_unset=True)
+    if "origen" in datos_vuelo or "destino" in datos_vuelo:
+        # Origen y destino se validan juntos: el que no se modifica es el ya guardado
+        vuelo_actual = gestor.obtener_vuelo_por_id(id_vuelo)
+        if vuelo_actual is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vuelo no encontrado")
+        valido, mensaje = ValidadorVuelos.validar_origen_destino(
+            datos_vuelo.get("origen", vuelo_actual.origen),
+            datos_vuelo.get("destino", vuelo_actual.destino)
+        )
+        if not valido:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=mensaje)
+    _verificar_referencias(datos_vuelo, gestor)
+    vuelo_actualizado = gestor.actualizar_vuelo(id_vuelo, datos_vuelo)
     if vuelo_actualizado is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vuelo no encontrado")
     return vuelo_actualizado
@@ -150,24 +502,18 @@ def actualizar_vuelo(id_vuelo: int, vuelo: ActualizarVuelo, gestor: GestorVuelos
            summary="Eliminar un vuelo",
            description="Elimina un vuelo del sistema (lo marca como cancelado).")
 def eliminar_vuelo(id_vuelo: int, gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    # Primero encontramos la posición del vuelo en la lista
-    vuelos = gestor.obtener_todos_los_vuelos()
-    posicion = None
-    
-    for i, vuelo in enumerate(vuelos):
-        if vuelo.id == id_vuelo:
-            posicion = i
-            break
-    
-    if posicion is None:
+    # Solo se recorre la cola del aeropuerto de origen del vuelo
+    vuelo = gestor.eliminar_vuelo_por_id(id_vuelo)
+    if vuelo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vuelo no encontrado")
     
-    return gestor.eliminar_vuelo_en_posicion(posicion)
+    return vuelo
 
 @app.post("/vuelos/posicion/{posicion}", response_model=RespuestaVuelo,
           summary="Insertar vuelo en posición específica",
-          description="Inserta un nuevo vuelo en una posición específica de la lista.")
+          description="Inserta un nuevo vuelo en una posición específica de la cola de su aeropuerto de origen.")
 def insertar_vuelo_en_posicion(posicion: int, vuelo: CrearVuelo, gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
+    _verificar_referencias(vuelo.dict(), gestor)
     try:
         return gestor.insertar_vuelo_en_posicion(vuelo.dict(), posicion)
     except IndexError:
@@ -175,51 +521,62 @@ def insertar_vuelo_en_posicion(posicion: int, vuelo: CrearVuelo, gestor: GestorV
 
 @app.get("/vuelos/cola/primero", response_model=RespuestaVuelo,
          summary="Obtener primer vuelo",
-         description="Retorna el primer vuelo de la lista (próximo a salir).")
-def obtener_primer_vuelo(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    vuelo = gestor.obtener_primer_vuelo()
+         description="Retorna el primer vuelo de la lista (próximo a salir), global o de un aeropuerto de origen.")
+def obtener_primer_vuelo(
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    vuelo = gestor.obtener_primer_vuelo(origen)
     if vuelo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hay vuelos en la cola")
     return vuelo
 
 @app.get("/vuelos/cola/ultimo", response_model=RespuestaVuelo,
          summary="Obtener último vuelo",
-         description="Retorna el último vuelo de la lista.")
-def obtener_ultimo_vuelo(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    vuelo = gestor.obtener_ultimo_vuelo()
+         description="Retorna el último vuelo de la lista, global o de un aeropuerto de origen.")
+def obtener_ultimo_vuelo(
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    vuelo = gestor.obtener_ultimo_vuelo(origen)
     if vuelo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hay vuelos en la cola")
     return vuelo
 @app.get("/vuelos/filtrar/estado/{estado}", response_model=List[RespuestaVuelo],
          summary="Filtrar vuelos por estado",
-         description="Retorna todos los vuelos que tienen un estado específico.")
+         description="Retorna los vuelos que tienen un estado específico (los cancelados, que no "
+                     "están en las colas, se consultan en la base de datos).")
 def filtrar_vuelos_por_estado(
     estado: str, 
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
     gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
 ):
-    estados_validos = ["programado", "abordando", "despegado", "retrasado", "cancelado"]
-    if estado not in estados_validos:
+    valido, mensaje = ValidadorVuelos.validar_estado(estado)
+    if not valido:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
-            detail=f"Estado inválido. Debe ser uno de: {', '.join(estados_validos)}"
+            detail=mensaje
         )
     
-    vuelos = gestor.obtener_vuelos_por_estado(estado)
+    vuelos = gestor.obtener_vuelos_por_estado(estado, origen)
     return vuelos
 
 @app.get("/vuelos/filtrar/aerolinea/{aerolinea}", response_model=List[RespuestaVuelo],
          summary="Filtrar vuelos por aerolínea",
-         description="Retorna todos los vuelos de una aerolínea específica.")
+         description="Retorna los vuelos de una aerolínea específica: los de las colas y "
+                     "después los cancelados.")
 def filtrar_vuelos_por_aerolinea(
     aerolinea: str,
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
     gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
 ):
-    vuelos = gestor.obtener_vuelos_por_aerolinea(aerolinea)
+    vuelos = gestor.obtener_vuelos_por_aerolinea(aerolinea, origen)
     return vuelos
 
 @app.get("/vuelos/filtrar/ruta", response_model=List[RespuestaVuelo],
          summary="Filtrar vuelos por origen/destino",
-         description="Retorna todos los vuelos que coinciden con el origen y/o destino especificados.")
+         description="Retorna los vuelos que coinciden con el origen y/o destino especificados: "
+                     "los de las colas y después los cancelados.")
 def filtrar_vuelos_por_ruta(
     origen: Optional[str] = None,
     destino: Optional[str] = None,
@@ -234,11 +591,29 @@ def filtrar_vuelos_por_ruta(
     vuelos = gestor.obtener_vuelos_por_origen_destino(origen, destino)
     return vuelos
 
+@app.post("/vuelos/reordenar", response_model=List[RespuestaVuelo],
+          summary="Reordenar la cola de un origen",
+          description="Aplica de una vez una lista de movimientos (id de vuelo, nueva posición) o un orden "
+                      "completo de IDs a la cola de un aeropuerto de origen. Se valida todo antes de "
+                      "modificar la cola y el nuevo orden se guarda en una sola transacción.")
+def reordenar_cola(reordenamiento: ReordenarCola, gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
+    movimientos = None
+    if reordenamiento.movimientos is not None:
+        movimientos = [(m.id_vuelo, m.posicion) for m in reordenamiento.movimientos]
+    try:
+        return gestor.reordenar_cola(reordenamiento.origen, movimientos=movimientos, orden=reordenamiento.orden)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @app.post("/vuelos/reordenar/retrasos", response_model=List[RespuestaVuelo],
           summary="Reordenar vuelos por retrasos",
-          description="Reordena los vuelos colocando los retrasados al final de la lista.")
-def reordenar_vuelos_por_retrasos(gestor: GestorVuelos = Depends(obtener_gestor_vuelos)):
-    return gestor.reordenar_vuelos_por_retrasos()
+          description="Reordena los vuelos colocando los retrasados al final de la cola de cada origen "
+                      "(o solo de la cola del origen indicado).")
+def reordenar_vuelos_por_retrasos(
+    origen: Optional[str] = Query(None, description="Limitar a la cola de este aeropuerto de origen"),
+    gestor: GestorVuelos = Depends(obtener_gestor_vuelos)
+):
+    return gestor.reordenar_vuelos_por_retrasos(origen)
 
 @app.get("/vuelos/buscar/{numero_vuelo}", response_model=RespuestaVuelo,
          summary="Buscar vuelo por número",
@@ -250,4 +625,96 @@ def buscar_vuelo_por_numero(
     vuelo = gestor.buscar_vuelo_por_numero(numero_vuelo)
     if vuelo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vuelo no encontrado")
-    return vuelo
\ No newline at end of file
+    return vuelo
+
+# AEROLÍNEAS
+
+@app.post("/aerolineas/", response_model=RespuestaAerolinea, status_code=status.HTTP_201_CREATED,
+          summary="Crear una aerolínea",
+          description="Registra una nueva aerolínea en las tablas de referencia.")
+def crear_aerolinea(aerolinea: CrearAerolinea, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    if gestor.obtener_aerolinea(aerolinea.codigo):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe una aerolínea con el código {aerolinea.codigo}"
+        )
+    return gestor.crear_aerolinea(aerolinea.dict())
+
+@app.get("/aerolineas/", response_model=List[RespuestaAerolinea],
+         summary="Obtener todas las aerolíneas",
+         description="Retorna todas las aerolíneas registradas.")
+def leer_aerolineas(gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    return gestor.listar_aerolineas()
+
+@app.get("/aerolineas/{codigo}", response_model=RespuestaAerolinea,
+         summary="Obtener una aerolínea",
+         description="Retorna una aerolínea por su código.")
+def leer_aerolinea(codigo: str, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    aerolinea = gestor.obtener_aerolinea(codigo)
+    if aerolinea is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aerolínea no encontrada")
+    return aerolinea
+
+@app.put("/aerolineas/{codigo}", response_model=RespuestaAerolinea,
+         summary="Actualizar una aerolínea",
+         description="Actualiza la información de una aerolínea existente.")
+def actualizar_aerolinea(codigo: str, aerolinea: ActualizarAerolinea,
+                         gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    aerolinea_actualizada = gestor.actualizar_aerolinea(codigo, aerolinea.dict(exclude_unset=True))
+    if aerolinea_actualizada is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aerolínea no encontrada")
+    return aerolinea_actualizada
+
+@app.delete("/aerolineas/{codigo}", response_model=MensajeRespuesta,
+            summary="Eliminar una aerolínea",
+            description="Elimina una aerolínea de las tablas de referencia.")
+def eliminar_aerolinea(codigo: str, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    if gestor.eliminar_aerolinea(codigo) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aerolínea no encontrada")
+    return {"mensaje": f"Aerolínea {codigo} eliminada"}
+
+# AEROPUERTOS
+
+@app.post("/aeropuertos/", response_model=RespuestaAeropuerto, status_code=status.HTTP_201_CREATED,
+          summary="Crear un aeropuerto",
+          description="Registra un nuevo aeropuerto en las tablas de referencia.")
+def crear_aeropuerto(aeropuerto: CrearAeropuerto, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    if gestor.obtener_aeropuerto(aeropuerto.codigo_iata):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un aeropuerto con el código {aeropuerto.codigo_iata}"
+        )
+    return gestor.crear_aeropuerto(aeropuerto.dict())
+
+@app.get("/aeropuertos/", response_model=List[RespuestaAeropuerto],
+         summary="Obtener todos los aeropuertos",
+         description="Retorna todos los aeropuertos registrados.")
+def leer_aeropuertos(gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    return gestor.listar_aeropuertos()
+
+@app.get("/aeropuertos/{codigo_iata}", response_model=RespuestaAeropuerto,
+         summary="Obtener un aeropuerto",
+         description="Retorna un aeropuerto por su código IATA.")
+def leer_aeropuerto(codigo_iata: str, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    aeropuerto = gestor.obtener_aeropuerto(codigo_iata)
+    if aeropuerto is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aeropuerto no encontrado")
+    return aeropuerto
+
+@app.put("/aeropuertos/{codigo_iata}", response_model=RespuestaAeropuerto,
+         summary="Actualizar un aeropuerto",
+         description="Actualiza la información de un aeropuerto existente.")
+def actualizar_aeropuerto(codigo_iata: str, aeropuerto: ActualizarAeropuerto,
+                          gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    aeropuerto_actualizado = gestor.actualizar_aeropuerto(codigo_iata, aeropuerto.dict(exclude_unset=True))
+    if aeropuerto_actualizado is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aeropuerto no encontrado")
+    return aeropuerto_actualizado
+
+@app.delete("/aeropuertos/{codigo_iata}", response_model=MensajeRespuesta,
+            summary="Eliminar un aeropuerto",
+            description="Elimina un aeropuerto de las tablas de referencia.")
+def eliminar_aeropuerto(codigo_iata: str, gestor: GestorReferencias = Depends(obtener_gestor_referencias)):
+    if gestor.eliminar_aeropuerto(codigo_iata) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aeropuerto no encontrado")
+    return {"mensaje": f"Aeropuerto {codigo_iata} eliminado"}
@@ -0,0 +1,110 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, delete, insert, literal, select
+from modelos import HistorialVuelo, Vuelo, VueloArchivado
+
+logger = logging.getLogger("vuelos_app")
+
+# Estados en los que un vuelo ya no vuelve a la operación
+ESTADOS_ARCHIVABLES = ("despegado", "cancelado")
+
+# Columnas copiadas tal cual; el ID del vuelo se guarda en id_original
+COLUMNAS_ARCHIVADAS = ("numero_vuelo", "aerolinea", "origen", "destino", "hora_programada",
+                       "es_emergencia", "estado", "posicion_cola", "fecha_creacion", "fecha_actualizacion")
+
+
+class ArchivadorVuelos:
+    """Mueve a la tabla vuelos_archivados los vuelos despegados o cancelados antiguos.
+
+    Su historial de cambios se elimina con ellos, en la misma transacción (como al borrar
+    un vuelo con el ORM), para que no queden registros apuntando a vuelos inexistentes.
+
+    Trabaja por lotes acotados (un lote por transacción) para no bloquear la base de
+    datos mucho tiempo, y puede ejecutarse periódicamente en un hilo propio. Tras cada
+    lote llama a al_archivar con los vuelos archivados, para que el proceso los retire
+    de las colas y los contadores.
+    """
+
+    def __init__(self, fabrica_sesion, retencion_horas=48, tamanio_lote=500, intervalo_segundos=300,
+                 al_archivar=None):
+        self.fabrica_sesion = fabrica_sesion
+        self.retencion = timedelta(hours=retencion_horas)
+        self.tamanio_lote = tamanio_lote
+        self.intervalo = intervalo_segundos
+        self.al_archivar = al_archivar
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def archivar_lote(self, ahora=None):
+        """Archiva como máximo tamanio_lote vuelos y retorna los vuelos archivados"""
+        limite = (ahora or datetime.now()) - self.retencion
+        sesion = self.fabrica_sesion()
+        try:
+            ids = sesion.scalars(
+                select(Vuelo.id)
+                .where(Vuelo.estado.in_(ESTADOS_ARCHIVABLES), Vuelo.hora_programada < limite)
+                .order_by(Vuelo.hora_programada)
+                .limit(self.tamanio_lote)
+            ).all()
+            if not ids:
+                return []
+
+            # Se vuelve a comprobar la condición al copiar, dentro de la misma transacción de
+            # escritura, por si algún vuelo cambió desde la selección; se borran los copiados
+            condicion = (Vuelo.id.in_(ids), Vuelo.estado.in_(ESTADOS_ARCHIVABLES), Vuelo.hora_programada < limite)
+            columnas = [getattr(Vuelo, columna) for columna in COLUMNAS_ARCHIVADAS]
+            archivados = sesion.scalars(
+                insert(VueloArchivado).from_select(
+                    ["id_original", *COLUMNAS_ARCHIVADAS, "fecha_archivo"],
+                    select(Vuelo.id, *columnas, literal(datetime.now(), DateTime)).where(*condicion)
+                ).returning(VueloArchivado)
+            ).all()
+            ids_archivados = [vuelo.id_original for vuelo in archivados]
+            sesion.execute(delete(HistorialVuelo).where(HistorialVuelo.vuelo_id.in_(ids_archivados))
+                           .execution_options(synchronize_session=False))
+            sesion.execute(delete(Vuelo).where(Vuelo.id.in_(ids_archivados)).execution_options(synchronize_session=False))
+            sesion.commit()
+        except Exception:
+            sesion.rollback()
+            raise
+        finally:
+            sesion.close()
+
+        if archivados and self.al_archivar is not None:
+            self.al_archivar(archivados)
+        return archivados
+
+    def archivar_pendientes(self, ahora=None):
+        """Archiva lote a lote todos los vuelos que superan la retención y retorna cuántos fueron"""
+        total = 0
+        while not self._detener.is_set():
+            archivados = self.archivar_lote(ahora)
+            total += len(archivados)
+            if len(archivados) < self.tamanio_lote:
+                break
+        return total
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                total = self.archivar_pendientes()
+                if total:
+                    logger.info(f"Archivados {total} vuelos")
+            except Exception as e:
+                logger.error(f"Error al archivar vuelos: {e}")
+            self._detener.wait(self.intervalo)
+
+    def iniciar(self):
+        """Arranca el archivado periódico en segundo plano"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="archivador-vuelos", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        """Detiene el archivado periódico (tras terminar el lote en curso)"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
@@ -0,0 +1,56 @@
+import hashlib
+import os
+import tempfile
+from sqlalchemy.engine import make_url
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def ruta_bloqueo_por_defecto(url_base_de_datos):
+    """Archivo de bloqueo asociado a una base de datos: junto al archivo SQLite o en el directorio temporal"""
+    url = make_url(url_base_de_datos)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        return os.path.abspath(url.database) + ".lock"
+    resumen = hashlib.sha1(url_base_de_datos.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"sistema_gestion_vuelos-{resumen}.lock")
+
+
+class BloqueoProceso:
+    """Bloqueo exclusivo de archivo que garantiza un único proceso servidor por base de datos.
+
+    Las colas, los contadores y la caché de referencias viven en la memoria del proceso
+    y no se sincronizan entre procesos: con varios workers cada uno tendría su propia
+    copia y divergirían. El segundo proceso que intenta adquirir el bloqueo falla al
+    arrancar. El sistema operativo lo libera si el proceso termina de forma abrupta.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+
+    def adquirir(self):
+        """Toma el bloqueo sin esperar (RuntimeError si otro proceso ya lo tiene)"""
+        archivo = open(self.ruta, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            archivo.close()
+            raise RuntimeError(
+                f"Otro proceso ya sirve esta base de datos (bloqueo {self.ruta}); "
+                "el servidor debe ejecutarse con un único worker"
+            )
+        self._archivo = archivo
+
+    def liberar(self):
+        """Suelta el bloqueo (el archivo se conserva para no competir con otro proceso que lo abra)"""
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
@@ -0,0 +1,193 @@
+import threading
+from collections import OrderedDict
+from modelos import Aerolinea, Aeropuerto
+from validador_vuelos import PATRON_CODIGO_AEROLINEA
+
+
+def _datos_aerolinea(aerolinea):
+    return {
+        "id": aerolinea.id,
+        "codigo": aerolinea.codigo,
+        "nombre": aerolinea.nombre,
+        "pais_origen": aerolinea.pais_origen,
+        "logo_url": aerolinea.logo_url
+    }
+
+
+def _datos_aeropuerto(aeropuerto):
+    return {
+        "id": aeropuerto.id,
+        "codigo_iata": aeropuerto.codigo_iata,
+        "nombre": aeropuerto.nombre,
+        "ciudad": aeropuerto.ciudad,
+        "pais": aeropuerto.pais
+    }
+
+
+class _TablaEnCache:
+    """Entradas en caché de una tabla de referencia, con expulsión LRU"""
+
+    def __init__(self, modelo, columna_codigo, convertir, tamanio_maximo):
+        self.modelo = modelo
+        self.columna_codigo = columna_codigo
+        self.convertir = convertir
+        self.tamanio_maximo = tamanio_maximo
+        self.entradas = OrderedDict()  # codigo -> dict (o None si no existe en la base de datos)
+        self.codigos = None  # frozenset con todos los códigos registrados
+        self.generacion = 0  # se incrementa en cada invalidación
+
+    def guardar(self, codigo, datos):
+        self.entradas[codigo] = datos
+        self.entradas.move_to_end(codigo)
+        while len(self.entradas) > self.tamanio_maximo:
+            self.entradas.popitem(last=False)
+
+
+class CacheReferencias:
+    """Caché en memoria (read-through) de aerolíneas y aeropuertos.
+
+    Se comparte entre peticiones; las escrituras sobre las tablas de referencia
+    deben llamar a los métodos invalidar_* para mantenerla coherente.
+    """
+
+    def __init__(self, tamanio_maximo=1000):
+        self._lock = threading.Lock()
+        self._aerolineas = _TablaEnCache(Aerolinea, Aerolinea.codigo, _datos_aerolinea, tamanio_maximo)
+        self._aeropuertos = _TablaEnCache(Aeropuerto, Aeropuerto.codigo_iata, _datos_aeropuerto, tamanio_maximo)
+
+    def precargar(self, sesion_db):
+        """Carga de una vez (hasta el tamaño máximo) ambas tablas de referencia"""
+        for tabla in (self._aerolineas, self._aeropuertos):
+            with self._lock:
+                generacion = tabla.generacion
+            registros = sesion_db.query(tabla.modelo).limit(tabla.tamanio_maximo).all()
+            codigos = frozenset(codigo for (codigo,) in sesion_db.query(tabla.columna_codigo))
+            with self._lock:
+                # Si hubo una invalidación mientras se consultaba, lo leído puede ser anterior
+                # a la escritura que la provocó: la tabla se queda sin precargar
+                if tabla.generacion != generacion:
+                    continue
+                tabla.generacion += 1
+                tabla.entradas.clear()
+                for registro in registros:
+                    datos = tabla.convertir(registro)
+                    tabla.guardar(datos[tabla.columna_codigo.key], datos)
+                tabla.codigos = codigos
+
+    def _obtener(self, tabla, sesion_db, codigo):
+        with self._lock:
+            if codigo in tabla.entradas:
+                tabla.entradas.move_to_end(codigo)
+                return tabla.entradas[codigo]
+            generacion = tabla.generacion
+
+        registro = sesion_db.query(tabla.modelo).filter(tabla.columna_codigo == codigo).first()
+        datos = tabla.convertir(registro) if registro else None
+        with self._lock:
+            # No guardar lo leído si hubo una invalidación mientras se consultaba
+            if tabla.generacion == generacion:
+                tabla.guardar(codigo, datos)
+        return datos
+
+    def _obtener_varios(self, tabla, sesion_db, codigos):
+        """Resuelve varios códigos con una sola consulta para los que no están en caché"""
+        resultado = {}
+        faltantes = []
+        with self._lock:
+            for codigo in set(codigos):
+                if codigo in tabla.entradas:
+                    tabla.entradas.move_to_end(codigo)
+                    resultado[codigo] = tabla.entradas[codigo]
+                else:
+                    faltantes.append(codigo)
+            generacion = tabla.generacion
+
+        if faltantes:
+            registros = sesion_db.query(tabla.modelo).filter(tabla.columna_codigo.in_(faltantes)).all()
+            encontrados = {getattr(r, tabla.columna_codigo.key): tabla.convertir(r) for r in registros}
+            with self._lock:
+                vigente = tabla.generacion == generacion
+                for codigo in faltantes:
+                    datos = encontrados.get(codigo)
+                    if vigente:
+                        tabla.guardar(codigo, datos)
+                    resultado[codigo] = datos
+        return resultado
+
+    def _codigos(self, tabla, sesion_db):
+        with self._lock:
+            codigos = tabla.codigos
+            generacion = tabla.generacion
+        if codigos is None:
+            codigos = frozenset(codigo for (codigo,) in sesion_db.query(tabla.columna_codigo))
+            with self._lock:
+                if tabla.generacion == generacion:
+                    tabla.codigos = codigos
+        return codigos
+
+    def obtener_aerolinea(self, sesion_db, codigo):
+        """Retorna los datos de una aerolínea por su código, o None si no existe"""
+        return self._obtener(self._aerolineas, sesion_db, codigo)
+
+    def obtener_aeropuerto(self, sesion_db, codigo_iata):
+        """Retorna los datos de un aeropuerto por su código IATA, o None si no existe"""
+        return self._obtener(self._aeropuertos, sesion_db, codigo_iata)
+
+    def codigos_aerolineas(self, sesion_db):
+        """Conjunto de códigos de aerolíneas registrados"""
+        return self._codigos(self._aerolineas, sesion_db)
+
+    def codigos_aeropuertos(self, sesion_db):
+        """Conjunto de códigos IATA de aeropuertos registrados"""
+        return self._codigos(self._aeropuertos, sesion_db)
+
+    def enriquecer_vuelos(self, sesion_db, vuelos):
+        """Retorna los vuelos como diccionarios con el nombre de la aerolínea y la ciudad/país
+        de origen y destino, resolviendo cada código una sola vez desde la caché.
+
+        La aerolínea se busca por el campo aerolinea y, si no es un código registrado,
+        por el prefijo del número de vuelo. Los valores sin formato de código de aerolínea
+        no se buscan: no están registrados y solo llenarían la caché de entradas vacías."""
+        candidatos = [codigo for v in vuelos for codigo in (v.aerolinea, v.numero_vuelo[:2])
+                      if isinstance(codigo, str) and PATRON_CODIGO_AEROLINEA.match(codigo)]
+        aerolineas = self._obtener_varios(self._aerolineas, sesion_db, candidatos)
+        aeropuertos = self._obtener_varios(
+            self._aeropuertos, sesion_db, [v.origen for v in vuelos] + [v.destino for v in vuelos]
+        )
+
+        enriquecidos = []
+        for vuelo in vuelos:
+            aerolinea = aerolineas.get(vuelo.aerolinea) or aerolineas.get(vuelo.numero_vuelo[:2]) or {}
+            origen = aeropuertos.get(vuelo.origen) or {}
+            destino = aeropuertos.get(vuelo.destino) or {}
+            datos = {
+                "id": vuelo.id,
+                "numero_vuelo": vuelo.numero_vuelo,
+                "aerolinea": vuelo.aerolinea,
+                "origen": vuelo.origen,
+                "destino": vuelo.destino,
+                "hora_programada": vuelo.hora_programada,
+                "es_emergencia": vuelo.es_emergencia,
+                "estado": vuelo.estado,
+                "nombre_aerolinea": aerolinea.get("nombre"),
+                "ciudad_origen": origen.get("ciudad"),
+                "pais_origen": origen.get("pais"),
+                "ciudad_destino": destino.get("ciudad"),
+                "pais_destino": destino.get("pais")
+            }
+            enriquecidos.append(datos)
+        return enriquecidos
+
+    def invalidar_aerolinea(self, codigo):
+        """Descarta la entrada de una aerolínea tras crearla, modificarla o eliminarla"""
+        with self._lock:
+            self._aerolineas.entradas.pop(codigo, None)
+            self._aerolineas.codigos = None
+            self._aerolineas.generacion += 1
+
+    def invalidar_aeropuerto(self, codigo_iata):
+        """Descarta la entrada de un aeropuerto tras crearlo, modificarlo o eliminarlo"""
+        with self._lock:
+            self._aeropuertos.entradas.pop(codigo_iata, None)
+            self._aeropuertos.codigos = None
+            self._aeropuertos.generacion += 1
@@ -0,0 +1,136 @@
+import heapq
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from lista_doblemente_enlazada import ListaDoblementeEnlazada
+
+
+def clave_orden(vuelo):
+    """Orden usado para mezclar las colas: emergencias primero y luego por hora programada"""
+    return (not vuelo.es_emergencia, vuelo.hora_programada or datetime.min)
+
+
+# Copia inmutable del contenido de una cola: tupla de vuelos en orden y número de versión
+InstantaneaCola = namedtuple("InstantaneaCola", ["vuelos", "version"])
+
+
+class ColaOrigen:
+    """Cola de vuelos de un único aeropuerto de origen.
+
+    Un único escritor a la vez (el que tiene el bloqueo) modifica la lista
+    doblemente enlazada; al terminar cada lote de escrituras se publica una
+    instantánea inmutable. Los lectores solo usan la instantánea, así que nunca
+    esperan a un escritor ni ven enlaces a medio modificar.
+    """
+
+    def __init__(self, origen):
+        self.origen = origen
+        self.lista = ListaDoblementeEnlazada()
+        self.lock = threading.RLock()
+        self.instantanea = InstantaneaCola((), 0)
+        # Rangos ya asignados a vuelos que se están guardando sin el bloqueo tomado: cuentan
+        # al elegir otros rangos, pero sus vuelos no entran en la lista hasta confirmarse
+        self.reservas = set()
+        self._sin_reservas = threading.Condition(self.lock)
+
+    def liberar_reserva(self, rango):
+        """Retira un rango de las reservas pendientes (requiere el bloqueo)"""
+        self.reservas.discard(rango)
+        if not self.reservas:
+            self._sin_reservas.notify_all()
+
+    def esperar_sin_reservas(self):
+        """Espera, soltando el bloqueo mientras tanto, a que no queden reservas pendientes
+        (requiere el bloqueo; se usa antes de renumerar toda la cola)"""
+        self._sin_reservas.wait_for(lambda: not self.reservas)
+
+    def publicar(self):
+        """Publica una nueva instantánea con el contenido actual de la lista (requiere el bloqueo)"""
+        # La asignación de un atributo es atómica: los lectores ven la anterior o la nueva
+        self.instantanea = InstantaneaCola(tuple(self.lista.listar_todos()), self.instantanea.version + 1)
+
+    @contextmanager
+    def escritura(self):
+        """Bloquea la cola para escribir y publica la instantánea al terminar"""
+        with self.lock:
+            try:
+                yield self.lista
+            finally:
+                self.publicar()
+
+
+class ColasPorOrigen:
+    """Colas de vuelos particionadas por aeropuerto de origen.
+
+    Cada partición tiene su propia lista doblemente enlazada y su propio bloqueo,
+    de modo que las operaciones sobre un aeropuerto no recorren ni bloquean los
+    vuelos de los demás. Se comparte entre peticiones dentro de un mismo proceso.
+    """
+
+    def __init__(self):
+        self._colas = {}
+        self._lock = threading.Lock()
+        self.lock_carga = threading.Lock()
+        self.cargadas = False
+
+    def obtener(self, origen, crear=False):
+        """Retorna la cola de un origen (creándola si se indica), o None si no existe"""
+        cola = self._colas.get(origen)
+        if cola is None and crear:
+            with self._lock:
+                cola = self._colas.get(origen)
+                if cola is None:
+                    cola = ColaOrigen(origen)
+                    self._colas[origen] = cola
+        return cola
+
+    def reemplazar(self, colas):
+        """Sustituye todas las particiones de una vez (usado al cargar desde la base de datos)"""
+        with self._lock:
+            self._colas = dict(colas)
+            self.cargadas = True
+
+    def todas(self):
+        """Retorna las colas existentes ordenadas por código de origen"""
+        colas = self._colas
+        return [colas[origen] for origen in sorted(colas)]
+
+    def instantaneas(self):
+        """Instantáneas actuales de todas las particiones (sin bloquear)"""
+        return [cola.instantanea for cola in self.todas()]
+
+    def longitud(self):
+        """Número total de vuelos en todas las particiones"""
+        return sum(len(instantanea.vuelos) for instantanea in self.instantaneas())
+
+    def iterar_global(self):
+        """Recorre de forma perezosa la mezcla de todas las particiones.
+
+        Este recorrido define el orden global: se conserva el orden interno de cada
+        partición y en cada paso se toma, de entre los primeros vuelos pendientes de
+        cada una, el menor según clave_orden (emergencias primero, luego hora
+        programada). Como una partición reordenada a mano no está ordenada por esa
+        clave, el orden global no lo está necesariamente. Las instantáneas se toman al
+        empezar y la mezcla solo guarda un vuelo por partición, así que recorrerla
+        entera usa memoria O(#orígenes).
+
+        Las instantáneas de las particiones se toman una tras otra, no todas a la vez:
+        un vuelo que cambia de origen mientras tanto puede aparecer en las dos o en
+        ninguna.
+        """
+        vuelos = [instantanea.vuelos for instantanea in self.instantaneas()]
+        return heapq.merge(*vuelos, key=clave_orden)
+
+    def vista_global(self):
+        """Mezcla todas las particiones en una única lista (ver iterar_global)"""
+        return list(self.iterar_global())
+
+    def primero_global(self):
+        """Primer vuelo de la vista global sin construirla"""
+        return next(self.iterar_global(), None)
+
+    def ultimo_global(self):
+        """Último vuelo de la vista global (recorre la mezcla sin guardarla)"""
+        ultimo = deque(self.iterar_global(), maxlen=1)
+        return ultimo[0] if ultimo else None
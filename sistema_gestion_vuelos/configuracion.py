@@ -13,6 +13,9 @@ class Configuracion:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./vuelos.db")
     
     # Configuración del servidor
+    # Archivo de bloqueo de un único proceso por base de datos (ver BloqueoProceso);
+    # por defecto, <base de datos>.lock
+    ARCHIVO_BLOQUEO = os.getenv("ARCHIVO_BLOQUEO")
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8000"))
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -24,6 +27,23 @@ class Configuracion:
     # Límites de la API
     MAX_VUELOS_POR_PAGINA = int(os.getenv("MAX_VUELOS_POR_PAGINA", "100"))
     
+    # Tamaño máximo de la caché de aerolíneas y aeropuertos (entradas por tabla)
+    CACHE_REFERENCIAS_TAMANIO_MAXIMO = int(os.getenv("CACHE_REFERENCIAS_TAMANIO_MAXIMO", "1000"))
+    
+    # Commit agrupado: un único escritor confirma varias escrituras por transacción.
+    # Más operaciones o más espera aumentan el rendimiento a costa de la latencia
+    COMMIT_AGRUPADO = os.getenv("COMMIT_AGRUPADO", "False").lower() == "true"
+    COMMIT_AGRUPADO_MAX_OPERACIONES = int(os.getenv("COMMIT_AGRUPADO_MAX_OPERACIONES", "64"))
+    COMMIT_AGRUPADO_ESPERA_MS = float(os.getenv("COMMIT_AGRUPADO_ESPERA_MS", "5"))  # milisegundos
+    
+    # Archivado de vuelos despegados y cancelados (desactivado por defecto): se mueven a
+    # vuelos_archivados cuando su hora programada supera la retención, por lotes y en
+    # segundo plano, y dejan de aparecer en los listados y filtros de vuelos
+    ARCHIVO_ACTIVO = os.getenv("ARCHIVO_ACTIVO", "False").lower() == "true"
+    ARCHIVO_RETENCION_HORAS = float(os.getenv("ARCHIVO_RETENCION_HORAS", "48"))
+    ARCHIVO_TAMANIO_LOTE = int(os.getenv("ARCHIVO_TAMANIO_LOTE", "500"))
+    ARCHIVO_INTERVALO_SEGUNDOS = float(os.getenv("ARCHIVO_INTERVALO_SEGUNDOS", "300"))
+    
     # Códigos de estados permitidos
     ESTADOS_VUELO = [
         "programado",
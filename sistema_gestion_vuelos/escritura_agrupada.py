@@ -0,0 +1,131 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger("vuelos_app")
+
+_FIN = object()
+
+
+class EscritorAgrupado:
+    """Escritor único que confirma en una sola transacción las escrituras de varias peticiones.
+
+    Cada petición envía una operación (una función que recibe la sesión y retorna su
+    resultado) y espera su Future. El hilo escritor toma la primera operación pendiente,
+    reúne las que lleguen durante espera_ms (hasta max_operaciones), las ejecuta y hace
+    un único commit. Si el lote falla, se deshace y cada operación se reintenta en su
+    propia transacción, de modo que el error solo llega a quien lo provocó. Por eso las
+    operaciones deben poder ejecutarse de nuevo desde cero.
+    """
+
+    def __init__(self, fabrica_sesion, max_operaciones=64, espera_ms=5):
+        self.fabrica_sesion = fabrica_sesion
+        self.max_operaciones = max_operaciones
+        self.espera = espera_ms / 1000
+        self._pendientes = queue.Queue()
+        self._hilo = None
+        self._conexion = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Arranca el hilo escritor (si no estaba en marcha)"""
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name="escritor-agrupado", daemon=True)
+                self._hilo.start()
+
+    def detener(self):
+        """Procesa las operaciones pendientes y detiene el hilo escritor"""
+        with self._lock:
+            hilo = self._hilo
+            self._hilo = None
+        if hilo is not None:
+            self._pendientes.put(_FIN)
+            hilo.join()
+
+    def enviar(self, operacion):
+        """Encola una operación de escritura y retorna un Future con su resultado"""
+        if self._hilo is None:
+            self.iniciar()
+        futuro = Future()
+        self._pendientes.put((operacion, futuro))
+        return futuro
+
+    def ejecutar(self, operacion):
+        """Encola una operación y espera a que su lote se confirme"""
+        return self.enviar(operacion).result()
+
+    def _bucle(self):
+        # El hilo escritor conserva su propia conexión: las peticiones retienen la suya
+        # mientras esperan su lote, y si el escritor la pidiera al pool en cada lote
+        # podría quedarse sin ninguna y bloquearlas a todas
+        self._conexion = self._abrir_conexion()
+        try:
+            self._atender()
+        finally:
+            self._conexion.close()
+            self._conexion = None
+
+    def _abrir_conexion(self):
+        sesion = self.fabrica_sesion()
+        try:
+            return sesion.get_bind().connect()
+        finally:
+            sesion.close()
+
+    def _atender(self):
+        terminar = False
+        while not terminar:
+            primera = self._pendientes.get()
+            if primera is _FIN:
+                break
+
+            # Reunir operaciones hasta completar el lote o agotar la ventana de espera
+            lote = [primera]
+            limite = time.monotonic() + self.espera
+            while len(lote) < self.max_operaciones:
+                restante = limite - time.monotonic()
+                try:
+                    siguiente = self._pendientes.get(timeout=restante) if restante > 0 else self._pendientes.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is _FIN:
+                    terminar = True
+                    break
+                lote.append(siguiente)
+
+            self._procesar(lote)
+
+    def _procesar(self, lote):
+        lote = [(operacion, futuro) for operacion, futuro in lote if futuro.set_running_or_notify_cancel()]
+        if not lote:
+            return
+
+        sesion = self.fabrica_sesion(bind=self._conexion)
+        try:
+            try:
+                resultados = [operacion(sesion) for operacion, _ in lote]
+                sesion.commit()
+            except Exception as e:
+                sesion.rollback()
+                logger.warning(f"Fallo en el lote de {len(lote)} escrituras, se reintentan por separado: {e}")
+                self._procesar_por_separado(sesion, lote)
+                return
+
+            for (_, futuro), resultado in zip(lote, resultados):
+                futuro.set_result(resultado)
+        finally:
+            sesion.close()
+
+    def _procesar_por_separado(self, sesion, lote):
+        for operacion, futuro in lote:
+            try:
+                resultado = operacion(sesion)
+                sesion.commit()
+            except Exception as e:
+                sesion.rollback()
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(resultado)
@@ -0,0 +1,238 @@
+import threading
+from collections import Counter
+
+# NumPy es opcional y solo se usa para la instantánea columnar; se importa la
+# primera vez que se necesita para no encarecer el arranque del proceso
+np = None
+
+
+def numpy_disponible():
+    """Importa NumPy de forma perezosa y retorna si está instalado"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def claves_vuelo(vuelo):
+    """Retorna las claves de agrupación de un vuelo: (estado, aerolinea, ruta, hora de salida)"""
+    hora = vuelo.hora_programada.hour if vuelo.hora_programada else None
+    return vuelo.estado, vuelo.aerolinea, f"{vuelo.origen}-{vuelo.destino}", hora
+
+
+class ContadoresVuelos:
+    """Contadores incrementales de vuelos por estado, aerolínea, ruta y hora de salida.
+
+    Cuentan todos los vuelos no archivados, incluidos los cancelados aunque no estén
+    en las colas. Se comparten entre peticiones y se actualizan en cada escritura del
+    gestor, de modo que leerlos cuesta O(#grupos) en lugar de recorrer todos los vuelos.
+    Se guardan las claves con las que cuenta cada vuelo, así que una modificación
+    resta exactamente lo que se sumó aunque otra petición lo haya cambiado antes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicializado = False
+        # Números de secuencia de las lecturas de actualizar que aún no terminaron
+        self._secuencia = 0
+        self._en_curso = set()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.total = 0
+        self.por_estado = Counter()
+        self.por_aerolinea = Counter()
+        self.por_ruta = Counter()
+        self.por_hora = Counter()
+        self._claves = {}  # id de vuelo -> claves con las que está contado
+        self._secuencias = {}  # id de vuelo -> secuencia de la lectura con la que está contado
+        self._retirados = {}  # id de vuelo retirado -> secuencia al retirarlo (ver actualizar)
+
+    def _aplicar(self, claves, delta):
+        estado, aerolinea, ruta, hora = claves
+        self.total += delta
+        for contador, clave in ((self.por_estado, estado), (self.por_aerolinea, aerolinea),
+                                (self.por_ruta, ruta), (self.por_hora, hora)):
+            contador[clave] += delta
+            if contador[clave] <= 0:
+                del contador[clave]
+
+    def _fijar(self, id_vuelo, claves):
+        """Cuenta un vuelo con las claves dadas, restando las que tuviera (requiere el bloqueo)"""
+        anteriores = self._claves.get(id_vuelo)
+        if anteriores == claves:
+            return
+        if anteriores is not None:
+            self._aplicar(anteriores, -1)
+        self._aplicar(claves, 1)
+        self._claves[id_vuelo] = claves
+
+    def _quitar(self, id_vuelo):
+        """Deja de contar un vuelo (requiere el bloqueo)"""
+        anteriores = self._claves.pop(id_vuelo, None)
+        self._secuencias.pop(id_vuelo, None)
+        if anteriores is not None:
+            self._aplicar(anteriores, -1)
+        # Una lectura en curso pudo empezar antes de que el vuelo dejara de existir
+        if self._en_curso:
+            self._retirados[id_vuelo] = self._secuencia
+
+    def reconstruir(self, vuelos):
+        """Recalcula todos los contadores a partir de una lista completa de vuelos"""
+        with self._lock:
+            self._reiniciar()
+            for vuelo in vuelos:
+                self._fijar(vuelo.id, claves_vuelo(vuelo))
+            self.inicializado = True
+
+    def _registrar(self, vuelo):
+        """Cuenta un vuelo recién creado, salvo que actualizar ya lo haya contado con una
+        lectura posterior (el vuelo está en su cola antes de registrarse) (requiere el bloqueo)"""
+        if vuelo.id not in self._secuencias and vuelo.id not in self._retirados:
+            self._fijar(vuelo.id, claves_vuelo(vuelo))
+
+    def registrar(self, vuelo):
+        """Suma un vuelo nuevo a los contadores"""
+        with self._lock:
+            self._registrar(vuelo)
+
+    def registrar_varios(self, vuelos):
+        """Suma varios vuelos nuevos bajo un único bloqueo"""
+        with self._lock:
+            for vuelo in vuelos:
+                self._registrar(vuelo)
+
+    def retirar_varios(self, ids_vuelo):
+        """Resta varios vuelos (por ID) bajo un único bloqueo"""
+        with self._lock:
+            for id_vuelo in ids_vuelo:
+                self._quitar(id_vuelo)
+
+    def actualizar(self, id_vuelo, leer_claves):
+        """Recuenta un vuelo modificado con las claves de su estado confirmado.
+
+        leer_claves debe leer el vuelo ya confirmado (None si ya no existe) y se llama sin
+        el bloqueo tomado. Antes de leer se toma un número de secuencia; la lectura con
+        el mayor empezó después del último commit, así que solo se aplica una lectura
+        con secuencia mayor que la del vuelo contado (o que la de su retirada) y dos
+        modificaciones concurrentes no dejan los contadores desfasados.
+        """
+        with self._lock:
+            self._secuencia += 1
+            secuencia = self._secuencia
+            self._en_curso.add(secuencia)
+        leida = False
+        try:
+            claves = leer_claves()
+            leida = True
+        finally:
+            with self._lock:
+                self._en_curso.discard(secuencia)
+                ultima = max(self._secuencias.get(id_vuelo, 0), self._retirados.get(id_vuelo, 0))
+                if leida and secuencia > ultima:
+                    if claves is None:
+                        self._quitar(id_vuelo)
+                    else:
+                        self._fijar(id_vuelo, claves)
+                        self._secuencias[id_vuelo] = secuencia
+                # Las retiradas solo importan mientras siga en curso una lectura anterior a ellas
+                if self._retirados:
+                    primera = min(self._en_curso, default=self._secuencia + 1)
+                    self._retirados = {id_retirado: retirado for id_retirado, retirado in self._retirados.items()
+                                       if retirado >= primera}
+
+    def resumen(self):
+        """Retorna una copia de los contadores actuales"""
+        with self._lock:
+            return {
+                "total": self.total,
+                "por_estado": dict(self.por_estado),
+                "por_aerolinea": dict(self.por_aerolinea),
+                "por_ruta": dict(self.por_ruta),
+                "por_hora": {hora: cantidad for hora, cantidad in self.por_hora.items() if hora is not None}
+            }
+
+
+class InstantaneaColumnar:
+    """Copia columnar (arrays de NumPy) del programa de vuelos para agrupaciones ad hoc.
+
+    Recibe la misma población que cuentan los ContadoresVuelos: los vuelos de las colas
+    y los cancelados.
+
+    Las columnas de texto se codifican como enteros (índices en el array de categorías
+    correspondiente), lo que permite agrupar por varias columnas con np.unique.
+    """
+
+    COLUMNAS = ("estado", "aerolinea", "origen", "destino", "hora")
+
+    def __init__(self, vuelos):
+        if not numpy_disponible():
+            raise RuntimeError("La instantánea columnar requiere NumPy instalado")
+
+        self.tamanio = len(vuelos)
+        self.categorias = {}
+        self.codigos = {}
+        valores = {
+            "estado": [v.estado for v in vuelos],
+            "aerolinea": [v.aerolinea for v in vuelos],
+            "origen": [v.origen for v in vuelos],
+            "destino": [v.destino for v in vuelos],
+            "hora": [v.hora_programada.hour if v.hora_programada else -1 for v in vuelos]
+        }
+        for columna, datos in valores.items():
+            arreglo = np.asarray(datos, dtype=np.int16 if columna == "hora" else object)
+            if columna != "hora":
+                arreglo = arreglo.astype(str)
+            categorias, codigos = np.unique(arreglo, return_inverse=True)
+            self.categorias[columna] = categorias
+            self.codigos[columna] = codigos.astype(np.int32)
+        self.es_emergencia = np.fromiter((bool(v.es_emergencia) for v in vuelos), dtype=bool, count=self.tamanio)
+
+    def _codigo_conjunto(self, columnas):
+        """Combina los códigos de varias columnas en un único código entero por fila"""
+        combinado = np.zeros(self.tamanio, dtype=np.int64)
+        for columna in columnas:
+            combinado = combinado * len(self.categorias[columna]) + self.codigos[columna]
+        return combinado
+
+    def _decodificar(self, columnas, codigo):
+        """Convierte un código combinado de nuevo en la tupla de valores de cada columna"""
+        valores = []
+        for columna in reversed(columnas):
+            categorias = self.categorias[columna]
+            codigo, indice = divmod(int(codigo), len(categorias))
+            valor = categorias[indice]
+            valores.append(valor.item() if hasattr(valor, "item") else valor)
+        return tuple(reversed(valores))
+
+    def contar_por(self, *columnas, mascara=None):
+        """Cuenta los vuelos agrupando por las columnas indicadas.
+
+        Retorna un diccionario {(valor_col1, valor_col2, ...): cantidad}.
+        """
+        for columna in columnas:
+            if columna not in self.COLUMNAS:
+                raise ValueError(f"Columna desconocida: {columna}")
+        if self.tamanio == 0:
+            return {}
+
+        codigos = self._codigo_conjunto(columnas)
+        if mascara is not None:
+            codigos = codigos[mascara]
+        grupos, cantidades = np.unique(codigos, return_counts=True)
+        return {self._decodificar(columnas, grupo): int(cantidad) for grupo, cantidad in zip(grupos, cantidades)}
+
+    def tasa_por(self, estado, *columnas):
+        """Proporción de vuelos en un estado dado dentro de cada grupo (p. ej. tasa de retrasos)"""
+        totales = self.contar_por(*columnas)
+        if not totales:
+            return {}
+        indice_estado = np.searchsorted(self.categorias["estado"], estado)
+        if indice_estado >= len(self.categorias["estado"]) or self.categorias["estado"][indice_estado] != estado:
+            return {grupo: 0.0 for grupo in totales}
+        en_estado = self.contar_por(*columnas, mascara=self.codigos["estado"] == indice_estado)
+        return {grupo: en_estado.get(grupo, 0) / total for grupo, total in totales.items()}
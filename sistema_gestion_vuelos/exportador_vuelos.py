@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import zlib
+from modelos import SesionLocal, Vuelo
+
+CAMPOS_EXPORTACION = ("id", "numero_vuelo", "aerolinea", "origen", "destino",
+                      "hora_programada", "es_emergencia", "estado")
+
+# Tamaño aproximado (en bytes) de cada fragmento enviado al cliente
+TAMANIO_FRAGMENTO = 64 * 1024
+
+
+def _valores(vuelo):
+    """Extrae los campos exportables de un vuelo (objeto ORM o fila de consulta)"""
+    hora = vuelo.hora_programada
+    return (vuelo.id, vuelo.numero_vuelo, vuelo.aerolinea, vuelo.origen, vuelo.destino,
+            hora.isoformat() if hora else None, bool(vuelo.es_emergencia), vuelo.estado)
+
+
+def filtrar_vuelos(vuelos, filtros):
+    """Aplica de forma perezosa los filtros {campo: valor} a un iterable de vuelos"""
+    activos = [(campo, valor) for campo, valor in filtros.items() if valor is not None]
+    for vuelo in vuelos:
+        if all(getattr(vuelo, campo) == valor for campo, valor in activos):
+            yield vuelo
+
+
+def iterar_vuelos_db(filtros, tamanio_bloque=1000, fabrica_sesion=SesionLocal):
+    """Recorre los vuelos de la base de datos por bloques (yield_per) sin cargarlos todos.
+
+    Abre su propia sesión porque el recorrido continúa después de que la petición
+    haya liberado la suya; la sesión se cierra al agotar o abandonar el generador.
+    """
+    sesion = fabrica_sesion()
+    try:
+        columnas = [getattr(Vuelo, campo) for campo in CAMPOS_EXPORTACION]
+        consulta = sesion.query(*columnas)
+        for campo, valor in filtros.items():
+            if valor is not None:
+                consulta = consulta.filter(getattr(Vuelo, campo) == valor)
+        for fila in consulta.order_by(Vuelo.id).yield_per(tamanio_bloque):
+            yield fila
+    finally:
+        sesion.close()
+
+
+def generar_ndjson(vuelos):
+    """Serializa los vuelos como JSON delimitado por saltos de línea, en fragmentos acotados"""
+    partes = []
+    tamanio = 0
+    for vuelo in vuelos:
+        linea = json.dumps(dict(zip(CAMPOS_EXPORTACION, _valores(vuelo))), ensure_ascii=False) + "\n"
+        partes.append(linea)
+        tamanio += len(linea)
+        if tamanio >= TAMANIO_FRAGMENTO:
+            yield "".join(partes).encode("utf-8")
+            partes = []
+            tamanio = 0
+    if partes:
+        yield "".join(partes).encode("utf-8")
+
+
+def generar_csv(vuelos):
+    """Serializa los vuelos como CSV con cabecera, en fragmentos acotados"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(CAMPOS_EXPORTACION)
+    for vuelo in vuelos:
+        escritor.writerow(_valores(vuelo))
+        if buffer.tell() >= TAMANIO_FRAGMENTO:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def comprimir_gzip(fragmentos):
+    """Comprime en formato gzip un flujo de fragmentos sin acumularlo en memoria"""
+    compresor = zlib.compressobj(wbits=31)  # 16 + MAX_WBITS: cabecera y cola gzip
+    for fragmento in fragmentos:
+        comprimido = compresor.compress(fragmento)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+FORMATOS_EXPORTACION = {
+    "ndjson": (generar_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (generar_csv, "text/csv; charset=utf-8", "csv"),
+}
+
+
+def exportar_vuelos(vuelos, formato, comprimir=False):
+    """Retorna (generador de bytes, tipo de contenido, extensión) para exportar los vuelos"""
+    generar, tipo_contenido, extension = FORMATOS_EXPORTACION[formato]
+    fragmentos = generar(vuelos)
+    if comprimir:
+        fragmentos = comprimir_gzip(fragmentos)
+    return fragmentos, tipo_contenido, extension
@@ -0,0 +1,104 @@
+from modelos import Aerolinea, Aeropuerto
+
+
+class GestorReferencias:
+    """Clase para gestionar las tablas de referencia (aerolíneas y aeropuertos)
+    manteniendo coherente la caché compartida"""
+
+    def __init__(self, sesion_db, cache):
+        self.sesion_db = sesion_db
+        self.cache = cache
+
+    # AEROLÍNEAS
+
+    def listar_aerolineas(self):
+        """Retorna todas las aerolíneas registradas"""
+        return self.sesion_db.query(Aerolinea).order_by(Aerolinea.codigo).all()
+
+    def obtener_aerolinea(self, codigo):
+        """Busca una aerolínea por su código (a través de la caché)"""
+        return self.cache.obtener_aerolinea(self.sesion_db, codigo)
+
+    def _buscar_aerolinea(self, codigo):
+        """Carga de la base de datos la aerolínea a modificar"""
+        return self.sesion_db.query(Aerolinea).filter(Aerolinea.codigo == codigo).first()
+
+    def crear_aerolinea(self, datos_aerolinea):
+        """Registra una nueva aerolínea"""
+        aerolinea = Aerolinea(**datos_aerolinea)
+        self.sesion_db.add(aerolinea)
+        self.sesion_db.commit()
+        self.sesion_db.refresh(aerolinea)
+        self.cache.invalidar_aerolinea(aerolinea.codigo)
+        return aerolinea
+
+    def actualizar_aerolinea(self, codigo, datos_aerolinea):
+        """Actualiza la información de una aerolínea"""
+        aerolinea = self._buscar_aerolinea(codigo)
+        if not aerolinea:
+            return None
+
+        for clave, valor in datos_aerolinea.items():
+            setattr(aerolinea, clave, valor)
+
+        self.sesion_db.commit()
+        self.cache.invalidar_aerolinea(codigo)
+        return aerolinea
+
+    def eliminar_aerolinea(self, codigo):
+        """Elimina una aerolínea"""
+        aerolinea = self._buscar_aerolinea(codigo)
+        if not aerolinea:
+            return None
+
+        self.sesion_db.delete(aerolinea)
+        self.sesion_db.commit()
+        self.cache.invalidar_aerolinea(codigo)
+        return aerolinea
+
+    # AEROPUERTOS
+
+    def listar_aeropuertos(self):
+        """Retorna todos los aeropuertos registrados"""
+        return self.sesion_db.query(Aeropuerto).order_by(Aeropuerto.codigo_iata).all()
+
+    def obtener_aeropuerto(self, codigo_iata):
+        """Busca un aeropuerto por su código IATA (a través de la caché)"""
+        return self.cache.obtener_aeropuerto(self.sesion_db, codigo_iata)
+
+    def _buscar_aeropuerto(self, codigo_iata):
+        """Carga de la base de datos el aeropuerto a modificar"""
+        return self.sesion_db.query(Aeropuerto).filter(Aeropuerto.codigo_iata == codigo_iata).first()
+
+    def crear_aeropuerto(self, datos_aeropuerto):
+        """Registra un nuevo aeropuerto"""
+        aeropuerto = Aeropuerto(**datos_aeropuerto)
+        self.sesion_db.add(aeropuerto)
+        self.sesion_db.commit()
+        self.sesion_db.refresh(aeropuerto)
+        self.cache.invalidar_aeropuerto(aeropuerto.codigo_iata)
+        return aeropuerto
+
+    def actualizar_aeropuerto(self, codigo_iata, datos_aeropuerto):
+        """Actualiza la información de un aeropuerto"""
+        aeropuerto = self._buscar_aeropuerto(codigo_iata)
+        if not aeropuerto:
+            return None
+
+        for clave, valor in datos_aeropuerto.items():
+            setattr(aeropuerto, clave, valor)
+
+        self.sesion_db.commit()
+        self.cache.invalidar_aeropuerto(codigo_iata)
+        return aeropuerto
+
+    def eliminar_aeropuerto(self, codigo_iata):
+        """Elimina un aeropuerto"""
+        aeropuerto = self._buscar_aeropuerto(codigo_iata)
+        if not aeropuerto:
+            return None
+
+        self.sesion_db.delete(aeropuerto)
+        self.sesion_db.commit()
+        self.cache.invalidar_aeropuerto(codigo_iata)
+        return aeropuerto
@@ -1,153 +1,685 @@
-from modelos import Vuelo
+from collections import defaultdict
+from itertools import chain
+from operator import attrgetter
+from modelos import Vuelo, VueloArchivado
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
 from lista_doblemente_enlazada import ListaDoblementeEnlazada
-from sqlalchemy import and_
+from colas_vuelos import ColasPorOrigen, ColaOrigen
+from cache_referencias import CacheReferencias
+from estadisticas_vuelos import ContadoresVuelos, InstantaneaColumnar, claves_vuelo
+
+# Máximo de parámetros por cláusula IN (SQLite limita las variables por consulta)
+TAMANIO_BLOQUE_IN = 500
+
+# Los vuelos cancelados siguen en la base de datos y en los contadores, pero no en las colas
+ESTADO_CANCELADO = "cancelado"
+
+# Separación entre los rangos (posicion_cola) de vuelos consecutivos al renumerar una cola:
+# deja hueco para insertar entre dos vuelos sin tocar los demás
+SEPARACION_RANGO = 1024
+
+def _en_bloques(valores, tamanio=TAMANIO_BLOQUE_IN):
+    """Divide una secuencia en bloques de tamaño acotado"""
+    valores = list(valores)
+    for inicio in range(0, len(valores), tamanio):
+        yield valores[inicio:inicio + tamanio]
+
+def _en_cola(vuelo):
+    """Indica si un vuelo debe estar en la cola de su origen"""
+    return vuelo.estado != ESTADO_CANCELADO
+
+def _encolar(lista, vuelo):
+    """Añade un vuelo a una lista: las emergencias al frente y el resto al final"""
+    if vuelo.es_emergencia:
+        lista.insertar_al_frente(vuelo)
+    else:
+        lista.insertar_al_final(vuelo)
+
+# Las colas se mantienen ordenadas por rango
+_rango = attrgetter("posicion_cola")
+
+def _rango_entre(anterior, siguiente, reservados=(), al_frente=False):
+    """Rango para un vuelo colocado entre dos vecinos de la cola que no coincida con los rangos
+    reservados (None si no queda hueco o algún vecino aún no tiene rango). En una cola vacía
+    al_frente indica si va delante o detrás de los reservados"""
+    inferior = anterior.posicion_cola if anterior is not None else None
+    superior = siguiente.posicion_cola if siguiente is not None else None
+    if (anterior is not None and inferior is None) or (siguiente is not None and superior is None):
+        return None
+    
+    # Un rango reservado dentro del hueco cuenta como un vuelo más: el nuevo va delante de él,
+    # salvo al añadirse al final, que va detrás de todos
+    en_hueco = [r for r in reservados
+                if (inferior is None or r > inferior) and (superior is None or r < superior)]
+    if siguiente is None and not (anterior is None and al_frente):
+        limites = en_hueco + ([inferior] if inferior is not None else [])
+        return max(limites) + SEPARACION_RANGO if limites else 0
+    limites = en_hueco + ([superior] if superior is not None else [])
+    if anterior is None:
+        return min(limites) - SEPARACION_RANGO if limites else 0
+    superior = min(limites)
+    if superior - inferior < 2:
+        return None
+    return (inferior + superior) // 2
+
+def _crear_vuelo(sesion, datos_vuelo):
+    """Crea un vuelo en la sesión y lo vuelca para obtener su ID"""
+    nuevo_vuelo = Vuelo(**datos_vuelo)
+    sesion.add(nuevo_vuelo)
+    sesion.flush()
+    return nuevo_vuelo
+
+def _crear_vuelos(sesion, lista_datos_vuelo):
+    """Crea varios vuelos en la sesión y los vuelca para obtener sus IDs"""
+    nuevos_vuelos = [Vuelo(**datos_vuelo) for datos_vuelo in lista_datos_vuelo]
+    sesion.add_all(nuevos_vuelos)
+    sesion.flush()
+    return nuevos_vuelos
 
 class GestorVuelos:
-    """Clase para gestionar los vuelos utilizando la lista doblemente enlazada y la base de datos"""
+    """Clase para gestionar los vuelos utilizando la lista doblemente enlazada y la base de datos.
+    
+    Los vuelos se mantienen en una cola por aeropuerto de origen (ver ColasPorOrigen);
+    las operaciones posicionales y los filtros con origen se limitan a esa partición.
+    Las colas contienen todos los vuelos no cancelados, y los listados y filtros se
+    responden desde ellas. Cada vuelo en cola guarda en posicion_cola un rango que
+    reproduce el orden de su cola, y toda operación que cambia ese orden lo persiste.
+    Las lecturas usan la instantánea publicada de cada cola y no toman bloqueos.
+    Si se indica un EscritorAgrupado, las escrituras de vuelos se confirman a través
+    de él (varias peticiones por transacción) en lugar de en la sesión de la petición.
     
-    def __init__(self, sesion_db):
-        self.lista_vuelos = ListaDoblementeEnlazada()
+    Las altas y reubicaciones no esperan a la base de datos con el bloqueo de la cola
+    tomado: reservan el rango de su posición, lo sueltan mientras se guarda el vuelo y
+    lo enlazan por su rango al confirmarse. Así las escrituras concurrentes de un mismo
+    origen pueden confirmarse en el mismo lote.
+    """
+    
+    def __init__(self, sesion_db, cache_referencias=None, contadores=None, colas=None, escritor=None):
         self.sesion_db = sesion_db
+        self.escritor = escritor
+        # La caché de referencias, los contadores y las colas suelen compartirse entre
+        # peticiones; si no se indican, se usan unos propios
+        self.cache_referencias = cache_referencias if cache_referencias is not None else CacheReferencias()
+        self.contadores = contadores if contadores is not None else ContadoresVuelos()
+        self.colas = colas if colas is not None else ColasPorOrigen()
         
-        # Cargar vuelos existentes de la base de datos
-        self._cargar_desde_base_de_datos()
+        # Cargar vuelos existentes de la base de datos (solo la primera vez)
+        if not self.colas.cargadas:
+            with self.colas.lock_carga:
+                if not self.colas.cargadas:
+                    self._cargar_desde_base_de_datos()
     
     def _cargar_desde_base_de_datos(self):
-        """Carga los vuelos desde la base de datos a la lista enlazada"""
+        """Carga los vuelos desde la base de datos a las colas de cada origen"""
         vuelos = self.sesion_db.query(Vuelo).order_by(Vuelo.hora_programada).all()
         
-        # Primero cargar los vuelos de emergencia
+        # Las colas se comparten entre sesiones: los vuelos quedan desligados de esta
         for vuelo in vuelos:
-            if vuelo.es_emergencia:
-                self.lista_vuelos.insertar_al_frente(vuelo)
+            self.sesion_db.expunge(vuelo)
+        
+        self.contadores.reconstruir(vuelos)
+        
+        # Por cada origen: los vuelos en el orden de su rango. Los que aún no tienen rango
+        # (creados antes de guardarlo) van las emergencias delante y el resto detrás por hora
+        # programada, y se renumera la cola para fijar ese orden
+        grupos = defaultdict(lambda: ([], [], []))
+        for vuelo in filter(_en_cola, vuelos):
+            emergencias, posicionados, normales = grupos[vuelo.origen]
+            if vuelo.posicion_cola is not None:
+                posicionados.append(vuelo)
+            elif vuelo.es_emergencia:
+                emergencias.append(vuelo)
             else:
-                self.lista_vuelos.insertar_al_final(vuelo)
+                normales.append(vuelo)
+        
+        colas = {}
+        for origen, (emergencias, posicionados, normales) in grupos.items():
+            cola = colas[origen] = ColaOrigen(origen)
+            posicionados.sort(key=lambda v: v.posicion_cola)
+            # Las emergencias se apilan al frente, como hace _encolar
+            for vuelo in chain(reversed(emergencias), posicionados, normales):
+                cola.lista.insertar_al_final(vuelo)
+            if emergencias or normales:
+                self._persistir_rangos(cola.lista.listar_nodos())
+            cola.publicar()
+        
+        self.colas.reemplazar(colas)
+    
+    def _ejecutar_escritura(self, operacion):
+        """Ejecuta una operación de escritura (función que recibe la sesión) y la confirma.
+        
+        La operación puede ejecutarse más de una vez si el escritor agrupado reintenta su
+        lote, así que debe construir sus objetos y leer el estado previo dentro de ella.
+        """
+        if self.escritor is not None:
+            return self.escritor.ejecutar(operacion)
+        try:
+            resultado = operacion(self.sesion_db)
+            self.sesion_db.commit()
+        except Exception:
+            self.sesion_db.rollback()
+            raise
+        return resultado
+    
+    def _cola(self, origen, crear=False):
+        """Retorna la cola de un origen; si no existe y no se pide crearla, una cola vacía"""
+        cola = self.colas.obtener(origen, crear=crear)
+        return cola if cola is not None else ColaOrigen(origen)
+    
+    def _persistir_rangos(self, nodos):
+        """Renumera con separación uniforme los rangos de una cola completa (en el orden dado)
+        y guarda en una sola transacción los que cambian (requiere el bloqueo de la cola y que
+        no queden reservas pendientes)"""
+        cambios = [{"id_vuelo": nodo.vuelo.id, "origen_cola": nodo.vuelo.origen, "rango": indice * SEPARACION_RANGO}
+                   for indice, nodo in enumerate(nodos) if nodo.vuelo.posicion_cola != indice * SEPARACION_RANGO]
+        if cambios:
+            # Un vuelo que ya se guardó en otra cola (o que el archivador borró) pero aún no
+            # se retiró de esta no se actualiza: su rango guardado es el de la otra cola.
+            # Por eso es una sentencia de tabla, que no exige que coincidan todas las filas
+            tabla = Vuelo.__table__
+            sentencia = (update(tabla)
+                         .where(tabla.c.id == bindparam("id_vuelo"), tabla.c.origen == bindparam("origen_cola"))
+                         .values(posicion_cola=bindparam("rango")))
+            self._ejecutar_escritura(lambda sesion: sesion.execute(sentencia, cambios))
+        for indice, nodo in enumerate(nodos):
+            nodo.vuelo.posicion_cola = indice * SEPARACION_RANGO
+    
+    def _reservar_rango(self, cola, posicion=None):
+        """Reserva el rango de un vuelo que irá en la posición dada de la cola, o al final si no
+        se indica (requiere su bloqueo).
+        
+        Si no queda hueco, espera a que se confirmen las reservas pendientes y renumera la cola.
+        """
+        while True:
+            longitud = cola.lista.longitud()
+            en_posicion = longitud if posicion is None else min(posicion, longitud)
+            rango = _rango_entre(*cola.lista.vecinos_de_posicion(en_posicion), cola.reservas,
+                                 al_frente=posicion == 0)
+            if rango is not None:
+                cola.reservas.add(rango)
+                return rango
+            cola.esperar_sin_reservas()
+            self._persistir_rangos(cola.lista.listar_nodos())
+    
+    def _enlazar_reservados(self, cola, rangos, vuelos=None):
+        """Libera los rangos reservados en una cola y enlaza por su rango los vuelos ya guardados
+        (sin vuelos, si la escritura falló, solo libera las reservas)"""
+        with cola.escritura() as lista:
+            for rango in rangos:
+                cola.liberar_reserva(rango)
+            for vuelo in vuelos or ():
+                lista.insertar_ordenado(vuelo, _rango)
+    
+    def _posicion_por_hora(self, lista, vuelo, id_vuelo=None):
+        """Posición de un vuelo que entra en la cola: emergencias al frente y el resto antes del
+        primer vuelo normal con hora posterior (sin contar el propio vuelo)"""
+        if vuelo["es_emergencia"]:
+            return 0
+        return lista.posicion_de_primero(
+            lambda v: v.id != id_vuelo and not v.es_emergencia and v.hora_programada > vuelo["hora_programada"]
+        )
     
     def agregar_vuelo(self, datos_vuelo):
-        """Agrega un nuevo vuelo a la lista y a la base de datos"""
-        # Crear nuevo vuelo en la base de datos
-        nuevo_vuelo = Vuelo(**datos_vuelo)
-        self.sesion_db.add(nuevo_vuelo)
-        self.sesion_db.commit()
-        self.sesion_db.refresh(nuevo_vuelo)
-        
-        # Agregar a la lista enlazada según si es emergencia o no
-        if nuevo_vuelo.es_emergencia:
-            self.lista_vuelos.insertar_al_frente(nuevo_vuelo)
-        else:
-            self.lista_vuelos.insertar_al_final(nuevo_vuelo)
+        """Agrega un nuevo vuelo a la cola de su origen y a la base de datos"""
+        if datos_vuelo.get("estado") == ESTADO_CANCELADO:
+            nuevo_vuelo = self._ejecutar_escritura(lambda sesion: _crear_vuelo(sesion, datos_vuelo))
+            self.contadores.registrar(nuevo_vuelo)
+            return nuevo_vuelo
+        
+        # Agregar a la cola según si es emergencia o no
+        cola = self._cola(datos_vuelo["origen"], crear=True)
+        with cola.lock:
+            rango = self._reservar_rango(cola, 0 if datos_vuelo.get("es_emergencia") else None)
+        nuevo_vuelo = self._crear_con_rango(cola, datos_vuelo, rango)
         
+        self.contadores.registrar(nuevo_vuelo)
         return nuevo_vuelo
     
-    def obtener_todos_los_vuelos(self):
-        """Retorna todos los vuelos en la lista enlazada"""
-        return self.lista_vuelos.listar_todos()
+    def _crear_con_rango(self, cola, datos_vuelo, rango):
+        """Guarda un vuelo con el rango reservado en su cola y lo enlaza en ella"""
+        datos = dict(datos_vuelo, posicion_cola=rango)
+        nuevo_vuelo = None
+        try:
+            nuevo_vuelo = self._ejecutar_escritura(lambda sesion: _crear_vuelo(sesion, datos))
+        finally:
+            self._enlazar_reservados(cola, [rango], [nuevo_vuelo] if nuevo_vuelo is not None else None)
+        return nuevo_vuelo
+    
+    def agregar_vuelos_en_lote(self, lista_datos_vuelo):
+        """Agrega varios vuelos en una sola transacción (los datos deben venir validados)"""
+        por_origen = defaultdict(list)
+        for indice, datos_vuelo in enumerate(lista_datos_vuelo):
+            if datos_vuelo.get("estado") != ESTADO_CANCELADO:
+                por_origen[datos_vuelo["origen"]].append(indice)
+        
+        # Bloquear cada partición una sola vez para reservar los rangos de todo el lote:
+        # emergencias al frente y el resto al final, como hace _encolar
+        colas = {origen: self._cola(origen, crear=True) for origen in por_origen}
+        rangos = {}
+        for origen, indices in por_origen.items():
+            cola = colas[origen]
+            with cola.lock:
+                for indice in indices:
+                    posicion = 0 if lista_datos_vuelo[indice].get("es_emergencia") else None
+                    rangos[indice] = self._reservar_rango(cola, posicion)
+        
+        datos_con_rango = [dict(datos_vuelo, posicion_cola=rangos[indice]) if indice in rangos else datos_vuelo
+                           for indice, datos_vuelo in enumerate(lista_datos_vuelo)]
+        nuevos_vuelos = None
+        try:
+            nuevos_vuelos = self._ejecutar_escritura(lambda sesion: _crear_vuelos(sesion, datos_con_rango))
+        finally:
+            for origen, indices in por_origen.items():
+                vuelos = [nuevos_vuelos[indice] for indice in indices] if nuevos_vuelos is not None else None
+                self._enlazar_reservados(colas[origen], [rangos[indice] for indice in indices], vuelos)
+        
+        self.contadores.registrar_varios(nuevos_vuelos)
+        return nuevos_vuelos
+    
+    def obtener_codigos_referencia(self):
+        """Retorna los conjuntos de códigos de aeropuertos y aerolíneas registrados"""
+        codigos_aeropuerto = self.cache_referencias.codigos_aeropuertos(self.sesion_db)
+        codigos_aerolinea = self.cache_referencias.codigos_aerolineas(self.sesion_db)
+        return codigos_aeropuerto, codigos_aerolinea
+    
+    def obtener_numeros_existentes(self, numeros_vuelo):
+        """Retorna cuáles de los números de vuelo dados ya existen en la base de datos"""
+        existentes = set()
+        for bloque in _en_bloques(numeros_vuelo):
+            consulta = self.sesion_db.query(Vuelo.numero_vuelo).filter(Vuelo.numero_vuelo.in_(bloque))
+            existentes.update(numero for (numero,) in consulta)
+        return existentes
+    
+    def obtener_todos_los_vuelos(self, origen=None):
+        """Retorna los vuelos de la cola de un origen o, sin origen, la vista global de todas las colas"""
+        if origen is None:
+            return self.colas.vista_global()
+        return self._cola(origen).instantanea.vuelos
+    
+    def iterar_vuelos(self, origen=None):
+        """Como obtener_todos_los_vuelos, pero sin construir la lista de la vista global"""
+        if origen is None:
+            return self.colas.iterar_global()
+        return self._cola(origen).instantanea.vuelos
+    
+    def enriquecer_vuelos(self, vuelos):
+        """Añade a los vuelos los nombres de aerolínea y aeropuertos desde la caché de referencias"""
+        return self.cache_referencias.enriquecer_vuelos(self.sesion_db, vuelos)
     
     def obtener_vuelo_por_id(self, id_vuelo):
         """Busca un vuelo por su ID"""
         return self.sesion_db.query(Vuelo).filter(Vuelo.id == id_vuelo).first()
     
-    def obtener_primer_vuelo(self):
-        """Retorna el primer vuelo de la lista"""
-        return self.lista_vuelos.obtener_primero()
+    def obtener_primer_vuelo(self, origen=None):
+        """Retorna el primer vuelo de la cola de un origen (o de la vista global)"""
+        if origen is None:
+            return self.colas.primero_global()
+        vuelos = self._cola(origen).instantanea.vuelos
+        return vuelos[0] if vuelos else None
     
-    def obtener_ultimo_vuelo(self):
-        """Retorna el último vuelo de la lista"""
-        return self.lista_vuelos.obtener_ultimo()
+    def obtener_ultimo_vuelo(self, origen=None):
+        """Retorna el último vuelo de la cola de un origen (o de la vista global)"""
+        if origen is None:
+            return self.colas.ultimo_global()
+        vuelos = self._cola(origen).instantanea.vuelos
+        return vuelos[-1] if vuelos else None
     
     def insertar_vuelo_en_posicion(self, datos_vuelo, posicion):
-        """Inserta un vuelo en una posición específica"""
-        # Crear nuevo vuelo en la base de datos
-        nuevo_vuelo = Vuelo(**datos_vuelo)
-        self.sesion_db.add(nuevo_vuelo)
-        self.sesion_db.commit()
-        self.sesion_db.refresh(nuevo_vuelo)
-        
-        # Insertar en la posición indicada
-        self.lista_vuelos.insertar_en_posicion(nuevo_vuelo, posicion)
+        """Inserta un vuelo en una posición específica de la cola de su origen"""
+        cola = self._cola(datos_vuelo['origen'], crear=True)
+        with cola.lock:
+            # Validar la posición antes de escribir en la base de datos
+            if posicion < 0 or posicion > cola.lista.longitud():
+                raise IndexError("Posición fuera de rango")
+            
+            # Reservar el rango de esa posición (los cancelados no entran en la cola)
+            rango = None
+            if datos_vuelo.get("estado") != ESTADO_CANCELADO:
+                rango = self._reservar_rango(cola, posicion)
+        
+        if rango is None:
+            nuevo_vuelo = self._ejecutar_escritura(lambda sesion: _crear_vuelo(sesion, datos_vuelo))
+        else:
+            nuevo_vuelo = self._crear_con_rango(cola, datos_vuelo, rango)
+        
+        self.contadores.registrar(nuevo_vuelo)
         return nuevo_vuelo
     
-    def eliminar_vuelo_en_posicion(self, posicion):
-        """Remueve un vuelo de una posición específica"""
-        vuelo = self.lista_vuelos.extraer_de_posicion(posicion)
+    def _actualizar_contadores(self, id_vuelo):
+        """Recuenta un vuelo modificado leyendo su fila confirmada"""
+        def leer_claves():
+            fila = self.sesion_db.execute(
+                select(Vuelo.estado, Vuelo.aerolinea, Vuelo.origen, Vuelo.destino, Vuelo.hora_programada)
+                .where(Vuelo.id == id_vuelo)
+            ).first()
+            return claves_vuelo(fila) if fila is not None else None
+        
+        self.contadores.actualizar(id_vuelo, leer_claves)
+    
+    def _cancelar_en_base_de_datos(self, vuelo):
+        """Marca como cancelado un vuelo retirado de la cola y retorna su versión persistida"""
+        def cancelar(sesion):
+            vuelo_db = sesion.get(Vuelo, vuelo.id)
+            if vuelo_db is not None:
+                vuelo_db.estado = ESTADO_CANCELADO
+            return vuelo_db
+        
+        vuelo_db = self._ejecutar_escritura(cancelar)
+        if vuelo_db is None:
+            return vuelo
+        self._actualizar_contadores(vuelo_db.id)
+        return vuelo_db
+    
+    def eliminar_vuelo_en_posicion(self, posicion, origen):
+        """Remueve un vuelo de una posición específica de la cola de un origen"""
+        cola = self._cola(origen)
+        with cola.escritura() as lista:
+            vuelo = lista.extraer_de_posicion(posicion)
         if vuelo:
             # Actualizar en la base de datos (por ejemplo, marcar como cancelado)
-            vuelo.estado = "cancelado"
-            self.sesion_db.commit()
+            vuelo = self._cancelar_en_base_de_datos(vuelo)
         return vuelo
     
+    def eliminar_vuelo_por_id(self, id_vuelo):
+        """Remueve un vuelo de la cola de su origen buscándolo por ID (solo recorre esa partición)"""
+        vuelo_db = self.obtener_vuelo_por_id(id_vuelo)
+        if vuelo_db is None:
+            return None
+        
+        cola = self._cola(vuelo_db.origen)
+        with cola.escritura() as lista:
+            _, nodo = lista.buscar_por_id(id_vuelo)
+            if nodo is None:
+                return None
+            lista.extraer_nodo(nodo)
+        
+        return self._cancelar_en_base_de_datos(vuelo_db)
+    
+    def _reservar_reubicacion(self, vuelo_actual, datos_vuelo):
+        """Si un cambio mueve el vuelo dentro de las colas, reserva el rango de su nueva posición.
+        
+        Retorna (cola, rango) o (None, None) si el vuelo no se mueve o sale de la cola.
+        """
+        campos = ("origen", "es_emergencia", "hora_programada", "estado")
+        nuevo = {campo: datos_vuelo.get(campo, getattr(vuelo_actual, campo)) for campo in campos}
+        orden_actual = (vuelo_actual.origen, vuelo_actual.es_emergencia, vuelo_actual.hora_programada)
+        se_mueve = orden_actual != (nuevo["origen"], nuevo["es_emergencia"], nuevo["hora_programada"])
+        if nuevo["estado"] == ESTADO_CANCELADO or not (se_mueve or not _en_cola(vuelo_actual)):
+            return None, None
+        
+        cola = self._cola(nuevo["origen"], crear=True)
+        with cola.lock:
+            posicion = self._posicion_por_hora(cola.lista, nuevo, vuelo_actual.id)
+            return cola, self._reservar_rango(cola, posicion)
+    
+    def _reubicar_en_cola(self, id_vuelo, origen_anterior, vuelo, mantener_posicion, estaba_cancelado=False,
+                          cola_reservada=None, rango_reservado=None):
+        """Sustituye en las colas la versión anterior de un vuelo modificado.
+        
+        Un vuelo que pasa a cancelado sale de la cola y uno que deja de estarlo vuelve a entrar.
+        Si se guardó con el rango reservado por actualizar_vuelo se enlaza con él; si no (otra
+        petición lo cambió entre la reserva y la escritura), se le asigna uno aparte.
+        """
+        reinsertar = False
+        try:
+            cola_anterior = self._cola(origen_anterior)
+            with cola_anterior.escritura() as lista_anterior:
+                _, nodo = lista_anterior.buscar_por_id(id_vuelo)
+                if nodo is None and not estaba_cancelado:
+                    # Otra petición lo retiró mientras tanto (por ejemplo, al eliminarlo)
+                    return
+                if nodo is not None:
+                    if mantener_posicion and _en_cola(vuelo):
+                        # El rango leído al actualizar puede ser anterior a una renumeración de
+                        # la cola: vale el del vuelo sustituido (ya guardado, no hay que escribirlo)
+                        set_committed_value(vuelo, "posicion_cola", nodo.vuelo.posicion_cola)
+                        nodo.vuelo = vuelo
+                        return
+                    lista_anterior.extraer_nodo(nodo)
+            reinsertar = _en_cola(vuelo)
+        finally:
+            if cola_reservada is not None:
+                con_reserva = (reinsertar and vuelo.origen == cola_reservada.origen
+                               and vuelo.posicion_cola == rango_reservado)
+                self._enlazar_reservados(cola_reservada, [rango_reservado], [vuelo] if con_reserva else None)
+                reinsertar = reinsertar and not con_reserva
+        if not reinsertar:
+            return
+        
+        cola = self._cola(vuelo.origen, crear=True)
+        with cola.lock:
+            datos = {"es_emergencia": vuelo.es_emergencia, "hora_programada": vuelo.hora_programada}
+            rango = self._reservar_rango(cola, self._posicion_por_hora(cola.lista, datos, id_vuelo))
+        try:
+            self._ejecutar_escritura(lambda sesion: sesion.execute(
+                update(Vuelo).where(Vuelo.id == id_vuelo).values(posicion_cola=rango)
+            ))
+            vuelo.posicion_cola = rango
+        except Exception:
+            self._enlazar_reservados(cola, [rango])
+            raise
+        self._enlazar_reservados(cola, [rango], [vuelo])
+    
     def actualizar_vuelo(self, id_vuelo, datos_vuelo):
-        """Actualiza la información de un vuelo"""
-        vuelo = self.sesion_db.query(Vuelo).filter(Vuelo.id == id_vuelo).first()
-        if not vuelo:
+        """Actualiza la información de un vuelo.
+        
+        Si el cambio lo mueve de sitio en las colas, el rango de su nueva posición se reserva
+        antes de escribir y se guarda en la misma transacción que el resto de los cambios.
+        """
+        vuelo_actual = self.obtener_vuelo_por_id(id_vuelo)
+        if vuelo_actual is None:
             return None
+        cola_reservada, rango_reservado = self._reservar_reubicacion(vuelo_actual, datos_vuelo)
         
-        # Actualizar atributos
-        for clave, valor in datos_vuelo.items():
-            setattr(vuelo, clave, valor)
+        def actualizar(sesion):
+            vuelo = sesion.get(Vuelo, id_vuelo)
+            if not vuelo:
+                return None, None, None
+            
+            # Actualizar atributos
+            estaba_cancelado = not _en_cola(vuelo)
+            orden_anterior = (vuelo.origen, vuelo.es_emergencia, vuelo.hora_programada)
+            for clave, valor in datos_vuelo.items():
+                setattr(vuelo, clave, valor)
+            # Si el vuelo se reubica en la cola, toma el rango reservado para su nueva posición
+            if estaba_cancelado or orden_anterior != (vuelo.origen, vuelo.es_emergencia, vuelo.hora_programada):
+                vuelo.posicion_cola = rango_reservado
+            return vuelo, orden_anterior, estaba_cancelado
         
-        self.sesion_db.commit()
+        try:
+            vuelo, orden_anterior, estaba_cancelado = self._ejecutar_escritura(actualizar)
+        except Exception:
+            if cola_reservada is not None:
+                self._enlazar_reservados(cola_reservada, [rango_reservado])
+            raise
+        if not vuelo:
+            if cola_reservada is not None:
+                self._enlazar_reservados(cola_reservada, [rango_reservado])
+            return None
+        origen_anterior = orden_anterior[0]
+        self._actualizar_contadores(id_vuelo)
         
-        # Como la posición puede haber cambiado, reconstruimos la lista
-        self.lista_vuelos = ListaDoblementeEnlazada()
-        self._cargar_desde_base_de_datos()
+        # Solo se mueve el vuelo si cambió algo que determina su posición
+        mantener_posicion = orden_anterior == (vuelo.origen, vuelo.es_emergencia, vuelo.hora_programada)
+        self._reubicar_en_cola(id_vuelo, origen_anterior, vuelo, mantener_posicion, estaba_cancelado,
+                               cola_reservada, rango_reservado)
         
         return vuelo
     
+    def reordenar_cola(self, origen, movimientos=None, orden=None):
+        """Reordena de una vez la cola de un origen y persiste el nuevo orden.
+        
+        Acepta una lista de movimientos [(id_vuelo, nueva_posicion), ...], en la que los
+        vuelos no movidos conservan su orden relativo en las posiciones libres, o el orden
+        completo de IDs de la cola. Todo se valida antes de modificar nada (ValueError si
+        algo no es válido), los rangos se guardan en una sola transacción y la lista
+        se reenlaza en una pasada O(n).
+        """
+        cola = self._cola(origen)
+        with cola.escritura():
+            # Los rangos se renumeran todos: primero deben confirmarse las altas con rango reservado.
+            # Mientras se espera, otra reordenación puede haber sustituido la lista de la cola
+            cola.esperar_sin_reservas()
+            lista = cola.lista
+            nodos = lista.listar_nodos()
+            nodo_por_id = {nodo.vuelo.id: nodo for nodo in nodos}
+            
+            if orden is not None:
+                if len(orden) != len(nodos) or set(orden) != nodo_por_id.keys():
+                    raise ValueError(f"El orden debe contener exactamente los {len(nodos)} vuelos de la cola {origen}")
+                nuevo_orden = [nodo_por_id[id_vuelo] for id_vuelo in orden]
+            else:
+                nuevo_orden = [None] * len(nodos)
+                movidos = set()
+                for id_vuelo, posicion in movimientos or ():
+                    if id_vuelo not in nodo_por_id:
+                        raise ValueError(f"El vuelo {id_vuelo} no está en la cola {origen}")
+                    if id_vuelo in movidos:
+                        raise ValueError(f"El vuelo {id_vuelo} aparece en más de un movimiento")
+                    if posicion < 0 or posicion >= len(nodos):
+                        raise ValueError(f"Posición fuera de rango: {posicion}")
+                    if nuevo_orden[posicion] is not None:
+                        raise ValueError(f"La posición {posicion} está asignada a más de un vuelo")
+                    nuevo_orden[posicion] = nodo_por_id[id_vuelo]
+                    movidos.add(id_vuelo)
+                
+                # Los vuelos no movidos ocupan los huecos en su orden actual
+                restantes = (nodo for nodo in nodos if nodo.vuelo.id not in movidos)
+                nuevo_orden = [nodo if nodo is not None else next(restantes) for nodo in nuevo_orden]
+            
+            self._persistir_rangos(nuevo_orden)
+            lista.reenlazar(nuevo_orden)
+        
+        return cola.instantanea.vuelos
+    
+    def retirar_archivados(self, vuelos_archivados):
+        """Retira de las colas y de los contadores los vuelos que el archivador movió"""
+        ids_por_origen = defaultdict(set)
+        for vuelo in vuelos_archivados:
+            ids_por_origen[vuelo.origen].add(vuelo.id_original)
+        
+        # Los cancelados ya salieron de la cola al eliminarlos, pero siguen en los contadores
+        for origen, ids in ids_por_origen.items():
+            cola = self.colas.obtener(origen)
+            if cola is not None:
+                with cola.escritura():
+                    # Un vuelo que se está reubicando en esta cola aún no está enlazado: se
+                    # espera a que se confirme su reserva para no dejarlo en ella
+                    cola.esperar_sin_reservas()
+                    cola.lista.extraer_si(lambda v: v.id in ids)
+        self.contadores.retirar_varios([vuelo.id_original for vuelo in vuelos_archivados])
+    
+    def obtener_vuelos_archivados(self, skip=0, limit=100, numero_vuelo=None, origen=None, estado=None):
+        """Consulta los vuelos archivados (los más recientes primero)"""
+        consulta = self.sesion_db.query(VueloArchivado)
+        if numero_vuelo:
+            consulta = consulta.filter(VueloArchivado.numero_vuelo == numero_vuelo)
+        if origen:
+            consulta = consulta.filter(VueloArchivado.origen == origen)
+        if estado:
+            consulta = consulta.filter(VueloArchivado.estado == estado)
+        return consulta.order_by(VueloArchivado.hora_programada.desc()).offset(skip).limit(limit).all()
+    
     # MEJORAS
     
-    def longitud(self):
-        """Retorna el número total de vuelos en la lista"""
-        return self.lista_vuelos.longitud()
+    def longitud(self, origen=None):
+        """Retorna el número de vuelos en la cola de un origen o en todas las colas"""
+        if origen is None:
+            return self.colas.longitud()
+        return len(self._cola(origen).instantanea.vuelos)
+    
+    def contar_vuelos(self, origen=None):
+        """Retorna el número de vuelos de un origen o de todos incluidos los cancelados, que
+        no están en las colas (la misma población que cuentan las estadísticas)"""
+        cancelados = select(func.count()).select_from(Vuelo).where(Vuelo.estado == ESTADO_CANCELADO)
+        if origen is not None:
+            cancelados = cancelados.where(Vuelo.origen == origen)
+        return self.longitud(origen) + self.sesion_db.execute(cancelados).scalar_one()
     
-    def obtener_vuelos_por_estado(self, estado):
-        """Retorna todos los vuelos con un estado específico"""
-        vuelos = self.sesion_db.query(Vuelo).filter(Vuelo.estado == estado).all()
-        return vuelos
+    def obtener_estadisticas(self):
+        """Retorna los conteos de vuelos por estado, aerolínea, ruta y hora de salida"""
+        return self.contadores.resumen()
     
-    def obtener_vuelos_por_aerolinea(self, aerolinea):
-        """Retorna todos los vuelos de una aerolínea específica"""
-        vuelos = self.sesion_db.query(Vuelo).filter(Vuelo.aerolinea == aerolinea).all()
-        return vuelos
+    def obtener_instantanea_columnar(self):
+        """Construye una instantánea columnar (NumPy) de todos los vuelos para agrupaciones ad hoc"""
+        return InstantaneaColumnar(self.colas.vista_global() + self._obtener_cancelados())
+    
+    def _obtener_cancelados(self, **filtros):
+        """Consulta en la base de datos los vuelos cancelados (que no están en las colas) que
+        cumplen los filtros {campo: valor}, por hora programada"""
+        consulta = self.sesion_db.query(Vuelo).filter(Vuelo.estado == ESTADO_CANCELADO)
+        for campo, valor in filtros.items():
+            if valor is not None:
+                consulta = consulta.filter(getattr(Vuelo, campo) == valor)
+        return consulta.order_by(Vuelo.hora_programada, Vuelo.id).all()
+    
+    def obtener_vuelos_por_estado(self, estado, origen=None):
+        """Retorna los vuelos con un estado específico (de la cola de un origen si se indica).
+        
+        Los cancelados no están en las colas y se consultan en la base de datos.
+        """
+        if estado == ESTADO_CANCELADO:
+            return self._obtener_cancelados(origen=origen)
+        return [v for v in self.iterar_vuelos(origen) if v.estado == estado]
+    
+    def obtener_vuelos_por_aerolinea(self, aerolinea, origen=None):
+        """Retorna los vuelos de una aerolínea específica (de la cola de un origen si se indica):
+        primero los de las colas, en su orden, y después los cancelados"""
+        en_cola = [v for v in self.iterar_vuelos(origen) if v.aerolinea == aerolinea]
+        return en_cola + self._obtener_cancelados(aerolinea=aerolinea, origen=origen)
     
     def obtener_vuelos_por_origen_destino(self, origen=None, destino=None):
-        """Retorna los vuelos filtrados por origen y/o destino"""
-        filtros = []
-        if origen:
-            filtros.append(Vuelo.origen == origen)
+        """Retorna los vuelos filtrados por origen y/o destino: primero los de las colas, en su
+        orden, y después los cancelados"""
+        if not origen and not destino:
+            return []
+        # Con origen basta con recorrer la cola de ese aeropuerto
         if destino:
-            filtros.append(Vuelo.destino == destino)
+            en_cola = [v for v in self.iterar_vuelos(origen or None) if v.destino == destino]
+        else:
+            en_cola = list(self.obtener_todos_los_vuelos(origen))
+        return en_cola + self._obtener_cancelados(origen=origen or None, destino=destino or None)
+    
+    def _reordenar_cola_por_retrasos(self, cola):
+        """Reordena una cola colocando los retrasados al final"""
+        with cola.escritura():
+            cola.esperar_sin_reservas()
             
-        if filtros:
-            vuelos = self.sesion_db.query(Vuelo).filter(and_(*filtros)).all()
-            return vuelos
-        return []
-    
-    def reordenar_vuelos_por_retrasos(self):
-        """Reordena los vuelos basados en retrasos (los retrasados al final)"""
-        # Obtener todos los vuelos
-        todos_vuelos = self.lista_vuelos.listar_todos()
-        
-        # Crear una nueva lista ordenada
-        self.lista_vuelos = ListaDoblementeEnlazada()
-        
-        # Primero agregar emergencias
-        for vuelo in todos_vuelos:
-            if vuelo.es_emergencia and vuelo.estado != "retrasado":
-                self.lista_vuelos.insertar_al_frente(vuelo)
-        
-        # Luego agregar vuelos normales no retrasados
-        for vuelo in todos_vuelos:
-            if not vuelo.es_emergencia and vuelo.estado != "retrasado":
-                self.lista_vuelos.insertar_al_final(vuelo)
-        
-        # Finalmente agregar vuelos retrasados (al final)
-        for vuelo in todos_vuelos:
-            if vuelo.estado == "retrasado":
-                self.lista_vuelos.insertar_al_final(vuelo)
-                
-        return self.lista_vuelos.listar_todos()
+            # Obtener todos los vuelos
+            todos_vuelos = cola.lista.listar_todos()
+            
+            # Crear una nueva lista ordenada
+            nueva_lista = ListaDoblementeEnlazada()
+            
+            # Primero agregar emergencias
+            for vuelo in todos_vuelos:
+                if vuelo.es_emergencia and vuelo.estado != "retrasado":
+                    nueva_lista.insertar_al_frente(vuelo)
+            
+            # Luego agregar vuelos normales no retrasados
+            for vuelo in todos_vuelos:
+                if not vuelo.es_emergencia and vuelo.estado != "retrasado":
+                    nueva_lista.insertar_al_final(vuelo)
+            
+            # Finalmente agregar vuelos retrasados (al final)
+            for vuelo in todos_vuelos:
+                if vuelo.estado == "retrasado":
+                    nueva_lista.insertar_al_final(vuelo)
+            
+            self._persistir_rangos(nueva_lista.listar_nodos())
+            cola.lista = nueva_lista
+    
+    def reordenar_vuelos_por_retrasos(self, origen=None):
+        """Reordena los vuelos basados en retrasos (los retrasados al final), por cada origen"""
+        if origen is not None:
+            self._reordenar_cola_por_retrasos(self._cola(origen))
+        else:
+            for cola in self.colas.todas():
+                self._reordenar_cola_por_retrasos(cola)
+        
+        return self.obtener_todos_los_vuelos(origen)
     
     def buscar_vuelo_por_numero(self, numero_vuelo):
         """Busca un vuelo por su número de vuelo"""
-        return self.sesion_db.query(Vuelo).filter(Vuelo.numero_vuelo == numero_vuelo).first()
\ No newline at end of file
+        return self.sesion_db.query(Vuelo).filter(Vuelo.numero_vuelo == numero_vuelo).first()
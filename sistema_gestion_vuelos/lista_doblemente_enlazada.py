@@ -175,6 +175,124 @@ class ListaDoblementeEnlazada:
             
         return -1, None
     
+    def buscar_por_id(self, id_vuelo):
+        """Busca un vuelo por su ID y retorna su posición y el nodo"""
+        actual = self.cabeza
+        posicion = 0
+        
+        while actual:
+            if actual.vuelo.id == id_vuelo:
+                return posicion, actual
+            actual = actual.siguiente
+            posicion += 1
+            
+        return -1, None
+    
+    def extraer_nodo(self, nodo):
+        """Desenlaza un nodo ya localizado de la lista (O(1)) y retorna su vuelo"""
+        if nodo.anterior:
+            nodo.anterior.siguiente = nodo.siguiente
+        else:
+            self.cabeza = nodo.siguiente
+        
+        if nodo.siguiente:
+            nodo.siguiente.anterior = nodo.anterior
+        else:
+            self.cola = nodo.anterior
+        
+        nodo.anterior = None
+        nodo.siguiente = None
+        self.tamanio -= 1
+        return nodo.vuelo
+    
+    def extraer_si(self, condicion):
+        """Remueve en una sola pasada los vuelos que cumplen la condición y los retorna"""
+        extraidos = []
+        actual = self.cabeza
+        
+        while actual:
+            siguiente = actual.siguiente
+            if condicion(actual.vuelo):
+                extraidos.append(self.extraer_nodo(actual))
+            actual = siguiente
+            
+        return extraidos
+    
+    def listar_nodos(self):
+        """Devuelve una lista con todos los nodos en orden"""
+        nodos = []
+        actual = self.cabeza
+        while actual:
+            nodos.append(actual)
+            actual = actual.siguiente
+        return nodos
+    
+    def reenlazar(self, nodos):
+        """Reenlaza en una sola pasada (O(n)) los nodos de la lista en el orden dado.
+        
+        nodos debe contener exactamente los nodos actuales de la lista (una permutación).
+        """
+        if len(nodos) != self.tamanio:
+            raise ValueError("El nuevo orden debe contener todos los nodos de la lista")
+        
+        anterior = None
+        for nodo in nodos:
+            nodo.anterior = anterior
+            if anterior:
+                anterior.siguiente = nodo
+            anterior = nodo
+        if anterior:
+            anterior.siguiente = None
+        
+        self.cabeza = nodos[0] if nodos else None
+        self.cola = anterior
+    
+    def vecinos_de_posicion(self, posicion):
+        """Retorna los vuelos que quedarían antes y después de uno insertado en la posición dada"""
+        if posicion < 0 or posicion > self.tamanio:
+            raise IndexError("Posición fuera de rango")
+        
+        if posicion == self.tamanio:
+            return self.obtener_ultimo(), None
+        siguiente = self._obtener_nodo_en_posicion(posicion)
+        return (siguiente.anterior.vuelo if siguiente.anterior else None), siguiente.vuelo
+    
+    def insertar_ordenado(self, vuelo, clave):
+        """Inserta un vuelo detrás del último cuya clave no sea mayor que la suya (la lista debe
+        estar ordenada por esa clave). Busca desde el final, donde suelen ir los vuelos nuevos"""
+        valor = clave(vuelo)
+        if self.cabeza is None or valor < clave(self.cabeza.vuelo):
+            return self.insertar_al_frente(vuelo)
+        
+        actual = self.cola
+        while clave(actual.vuelo) > valor:
+            actual = actual.anterior
+        if actual is self.cola:
+            return self.insertar_al_final(vuelo)
+        
+        # Insertar después de actual
+        nuevo_nodo = Nodo(vuelo)
+        nuevo_nodo.anterior = actual
+        nuevo_nodo.siguiente = actual.siguiente
+        actual.siguiente.anterior = nuevo_nodo
+        actual.siguiente = nuevo_nodo
+        
+        self.tamanio += 1
+        return nuevo_nodo
+    
+    def posicion_de_primero(self, condicion):
+        """Retorna la posición del primer vuelo que cumple la condición (o la longitud si ninguno la cumple)"""
+        actual = self.cabeza
+        posicion = 0
+        
+        while actual:
+            if condicion(actual.vuelo):
+                return posicion
+            actual = actual.siguiente
+            posicion += 1
+            
+        return posicion
+    
     def invertir_lista(self):
         """Invierte el orden de la lista completa (útil para ciertos reportes)"""
         if self.cabeza is None or self.cabeza == self.cola:
@@ -1,12 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, create_engine, ForeignKey
+import threading
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, create_engine, ForeignKey, Index, MetaData, inspect, text, update
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from configuracion import Configuracion
 
 Base = declarative_base()
 
 class Vuelo(Base):
     __tablename__ = "vuelos"
+    __table_args__ = (
+        # Usado por el archivador (vuelos terminados antiguos) y los filtros por estado
+        Index("ix_vuelos_estado_hora_programada", "estado", "hora_programada"),
+        # Los IDs no se reutilizan: el archivador y las colas identifican por ID a los
+        # vuelos archivados, y un ID reasignado señalaría a otro vuelo
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     numero_vuelo = Column(String, unique=True, index=True)
@@ -17,6 +27,10 @@ class Vuelo(Base):
     es_emergencia = Column(Boolean, default=False)
     estado = Column(String)  # "programado", "abordando", "despegado", "cancelado", "retrasado"
     
+    # Rango del vuelo dentro de la cola de su origen: ordenar por él reproduce la cola
+    # (None en vuelos anteriores a esta columna; ver GestorVuelos)
+    posicion_cola = Column(Integer, nullable=True)
+    
     # Nueva columna para tracking de historial
     fecha_creacion = Column(DateTime, default=datetime.now)
     fecha_actualizacion = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -42,6 +56,31 @@ class Vuelo(Base):
         }
 
 
+class VueloArchivado(Base):
+    """Vuelos despegados o cancelados que el archivador retiró de la tabla de vuelos.
+    
+    Tiene su propio ID; el que tenía en la tabla de vuelos se guarda en id_original.
+    """
+    __tablename__ = "vuelos_archivados"
+    
+    id = Column(Integer, primary_key=True)
+    id_original = Column(Integer, index=True)
+    numero_vuelo = Column(String, index=True)
+    aerolinea = Column(String)
+    origen = Column(String, index=True)
+    destino = Column(String)
+    hora_programada = Column(DateTime, index=True)
+    es_emergencia = Column(Boolean, default=False)
+    estado = Column(String)
+    posicion_cola = Column(Integer, nullable=True)
+    fecha_creacion = Column(DateTime)
+    fecha_actualizacion = Column(DateTime)
+    fecha_archivo = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"VueloArchivado({self.numero_vuelo}, {self.estado}, {self.origen}->{self.destino})"
+
+
 class HistorialVuelo(Base):
     """Tabla para mantener historial de cambios en vuelos"""
     __tablename__ = "historial_vuelos"
@@ -89,7 +128,98 @@ class Aeropuerto(Base):
 
 
 # Configuración de la base de datos
-URL_BASE_DE_DATOS = "sqlite:///./vuelos.db"
-motor = create_engine(URL_BASE_DE_DATOS)
-Base.metadata.create_all(bind=motor)
-SesionLocal = sessionmaker(autocommit=False, autoflush=False, bind=motor)
\ No newline at end of file
+# El motor se crea la primera vez que se necesita: importar este módulo no abre
+# la base de datos ni crea el esquema (ver inicializar_base_de_datos)
+_motor = None
+_lock_motor = threading.Lock()
+
+# Los vuelos de las colas se comparten entre sesiones: no se expiran al confirmar
+_fabrica_sesiones = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+def obtener_motor():
+    """Retorna el motor de base de datos, creándolo de forma perezosa"""
+    global _motor
+    if _motor is None:
+        with _lock_motor:
+            if _motor is None:
+                argumentos = {}
+                if Configuracion.DATABASE_URL.startswith("sqlite"):
+                    # Las sesiones se usan desde varios hilos del servidor
+                    argumentos["connect_args"] = {"check_same_thread": False}
+                _motor = create_engine(Configuracion.DATABASE_URL, **argumentos)
+                _fabrica_sesiones.configure(bind=_motor)
+    return _motor
+
+
+def SesionLocal(**opciones):
+    """Crea una nueva sesión de base de datos (creando el motor si aún no existe)"""
+    obtener_motor()
+    return _fabrica_sesiones(**opciones)
+
+
+def _migrar_ids_sin_reutilizar(motor):
+    """Migración: recrea con AUTOINCREMENT la tabla de vuelos de bases de datos anteriores.
+    
+    SQLite no permite añadirlo con ALTER TABLE, así que se copia la tabla y se sustituye.
+    La secuencia continúa tras el mayor ID usado, contando también los ya archivados.
+    """
+    if motor.dialect.name != "sqlite":
+        return
+    tabla = Vuelo.__table__
+    with motor.begin() as conexion:
+        sql = conexion.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :nombre"), {"nombre": tabla.name}
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            return
+        
+        # Se copian las columnas existentes; las que aún no existían quedan a NULL, como al
+        # añadirlas con _agregar_columnas_faltantes
+        existentes = {columna["name"] for columna in inspect(conexion).get_columns(tabla.name)}
+        columnas = ", ".join(columna.name for columna in tabla.columns if columna.name in existentes)
+        nueva = tabla.to_metadata(MetaData(), name=f"{tabla.name}_migracion")
+        conexion.execute(CreateTable(nueva))
+        conexion.execute(text(f"INSERT INTO {nueva.name} ({columnas}) SELECT {columnas} FROM {tabla.name}"))
+        # Sustituir la tabla (sus índices se recrean con _agregar_columnas_faltantes)
+        conexion.execute(text(f"DROP TABLE {tabla.name}"))
+        conexion.execute(text(f"ALTER TABLE {nueva.name} RENAME TO {tabla.name}"))
+        
+        ultimo_id = conexion.execute(text(
+            f"SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM {tabla.name} "
+            f"UNION ALL SELECT MAX(id_original) FROM {VueloArchivado.__tablename__})"
+        )).scalar()
+        conexion.execute(text("DELETE FROM sqlite_sequence WHERE name IN (:nombre, :temporal)"),
+                         {"nombre": tabla.name, "temporal": nueva.name})
+        conexion.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:nombre, :ultimo)"),
+                         {"nombre": tabla.name, "ultimo": ultimo_id or 0})
+
+
+def _agregar_columnas_faltantes(motor):
+    """Migración simple: añade a las tablas existentes las columnas (e índices) nuevos del modelo"""
+    inspector = inspect(motor)
+    with motor.begin() as conexion:
+        for tabla in Base.metadata.sorted_tables:
+            if not inspector.has_table(tabla.name):
+                continue
+            existentes = {columna["name"] for columna in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name not in existentes:
+                    tipo = columna.type.compile(dialect=motor.dialect)
+                    conexion.execute(text(f"ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}"))
+            for indice in tabla.indexes:
+                indice.create(conexion, checkfirst=True)
+        # Los vuelos archivados antes de existir id_original usaban como ID el original
+        if inspector.has_table(VueloArchivado.__tablename__):
+            conexion.execute(
+                update(VueloArchivado).where(VueloArchivado.id_original.is_(None)).values(id_original=VueloArchivado.id)
+            )
+
+
+def inicializar_base_de_datos(motor=None):
+    """Crea el esquema y aplica las migraciones pendientes (paso explícito de arranque)"""
+    motor = motor if motor is not None else obtener_motor()
+    Base.metadata.create_all(bind=motor)
+    _migrar_ids_sin_reutilizar(motor)
+    _agregar_columnas_faltantes(motor)
+    return motor
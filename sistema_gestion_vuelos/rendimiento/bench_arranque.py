@@ -0,0 +1,116 @@
+"""Mide el coste de arranque de la aplicación.
+
+1. Tiempo de importación de api.py (y comprobación de que importar no crea la base de datos).
+2. Tiempo hasta la primera petición respondida y hasta que /salud/listo responde 200,
+   lanzando uvicorn contra una base de datos SQLite temporal con N vuelos.
+
+Uso: python rendimiento/bench_arranque.py [vuelos] [repeticiones]
+"""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos_prueba import crear_base_de_datos
+
+CODIGO_IMPORTACION = (
+    "import time; inicio = time.perf_counter(); import api; "
+    "print(time.perf_counter() - inicio)"
+)
+
+
+def _entorno(url_base_de_datos):
+    entorno = dict(os.environ)
+    entorno["DATABASE_URL"] = url_base_de_datos
+    entorno["LOG_LEVEL"] = "WARNING"
+    return entorno
+
+
+def medir_importacion(directorio, repeticiones):
+    """Importa api.py en procesos nuevos y retorna los tiempos de importación"""
+    ruta = os.path.join(directorio, "importacion.db")
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", CODIGO_IMPORTACION],
+            cwd=DIRECTORIO_APP, env=_entorno(f"sqlite:///{ruta}"),
+            capture_output=True, text=True, check=True
+        )
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    assert not os.path.exists(ruta), "Importar api.py no debería crear la base de datos"
+    return tiempos
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _consultar(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def medir_primera_peticion(ruta_base_de_datos):
+    """Lanza uvicorn y retorna (segundos hasta la primera respuesta, segundos hasta estar listo)"""
+    puerto = _puerto_libre()
+    base = f"http://127.0.0.1:{puerto}"
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(puerto), "--log-level", "warning"],
+        cwd=DIRECTORIO_APP, env=_entorno(f"sqlite:///{ruta_base_de_datos}")
+    )
+    primera = None
+    listo = None
+    try:
+        while listo is None and time.perf_counter() - inicio < 120:
+            codigo, _ = _consultar(f"{base}/salud/listo")
+            if codigo is not None and primera is None:
+                primera = time.perf_counter() - inicio
+            if codigo == 200:
+                listo = time.perf_counter() - inicio
+            else:
+                time.sleep(0.005)
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+    return primera, listo
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directorio:
+        tiempos = medir_importacion(directorio, repeticiones)
+        print(f"importación de api.py: mediana={statistics.median(tiempos) * 1000:.1f} ms "
+              f"min={min(tiempos) * 1000:.1f} ms ({repeticiones} procesos)")
+
+        ruta = os.path.join(directorio, "vuelos.db")
+        crear_base_de_datos(ruta, cantidad)
+        primeras, listos = [], []
+        for _ in range(repeticiones):
+            primera, listo = medir_primera_peticion(ruta)
+            primeras.append(primera)
+            listos.append(listo)
+        print(f"primera petición respondida: mediana={statistics.median(primeras) * 1000:.1f} ms")
+        print(f"listo con {cantidad} vuelos: mediana={statistics.median(listos) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compara el commit por petición con el commit agrupado en las altas de vuelos.
+
+Varios hilos (uno por "petición" concurrente) agregan vuelos a través de GestorVuelos,
+cada uno con su propia sesión, sobre una base de datos SQLite temporal en disco:
+
+- directo: cada alta hace su propio commit en la sesión de la petición.
+- agrupado: las altas se envían a un EscritorAgrupado con distintos límites de lote y
+  ventanas de espera, para mostrar el compromiso entre latencia y rendimiento.
+
+Cada modo se ejecuta con las altas repartidas entre varios orígenes y con todas en un
+mismo origen, donde los hilos compiten por el bloqueo de una sola partición. Al final
+se comprueba que todas las altas confirmadas están en la base de datos y en las colas.
+
+Uso: python rendimiento/bench_commit_agrupado.py [hilos] [altas_por_hilo]
+"""
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos_prueba import ORIGENES, crear_base_de_datos, datos_vuelo
+from colas_vuelos import ColasPorOrigen
+from escritura_agrupada import EscritorAgrupado
+from estadisticas_vuelos import ContadoresVuelos
+from gestor_vuelos import GestorVuelos
+from modelos import Vuelo
+
+# (nombre, max_operaciones, espera_ms); None indica commit directo
+MODOS = (
+    ("directo", None, None),
+    ("agrupado 64/0ms", 64, 0),
+    ("agrupado 64/2ms", 64, 2),
+    ("agrupado 64/10ms", 64, 10),
+    ("agrupado 8/2ms", 8, 2),
+)
+
+
+def _datos_un_origen(indice):
+    """Datos de prueba con el mismo origen para todos los vuelos"""
+    return dict(datos_vuelo(indice), origen=ORIGENES[0], destino=ORIGENES[1])
+
+
+def _cliente(fabrica, compartido, escritor, generar, indices, latencias, errores):
+    sesion = fabrica()
+    try:
+        gestor = GestorVuelos(sesion, contadores=compartido["contadores"], colas=compartido["colas"],
+                              escritor=escritor)
+        for indice in indices:
+            inicio = time.perf_counter()
+            try:
+                gestor.agregar_vuelo(generar(indice))
+            except Exception as e:
+                errores.append(repr(e))
+                continue
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        sesion.close()
+
+
+def ejecutar(directorio, nombre, max_operaciones, espera_ms, hilos, altas, un_origen=False):
+    """Ejecuta un modo y retorna (altas/s, latencias en segundos, errores)"""
+    generar = _datos_un_origen if un_origen else datos_vuelo
+    nombre = f"{nombre} ({'un origen' if un_origen else 'repartido'})"
+    fabrica = crear_base_de_datos(os.path.join(directorio, f"{nombre.replace('/', '_')}.db"), 0)
+    compartido = {"contadores": ContadoresVuelos(), "colas": ColasPorOrigen()}
+    escritor = None
+    if max_operaciones is not None:
+        escritor = EscritorAgrupado(fabrica, max_operaciones=max_operaciones, espera_ms=espera_ms)
+        escritor.iniciar()
+
+    indices = itertools.count()
+    latencias = []
+    errores = []
+    trabajos = [[next(indices) for _ in range(altas)] for _ in range(hilos)]
+    clientes = [threading.Thread(target=_cliente, args=(fabrica, compartido, escritor, generar, t, latencias, errores))
+                for t in trabajos]
+
+    inicio = time.perf_counter()
+    for cliente in clientes:
+        cliente.start()
+    for cliente in clientes:
+        cliente.join()
+    duracion = time.perf_counter() - inicio
+    if escritor is not None:
+        escritor.detener()
+
+    with fabrica() as sesion:
+        en_base_de_datos = sesion.query(Vuelo).count()
+    assert en_base_de_datos == len(latencias), \
+        f"{nombre}: {en_base_de_datos} vuelos en la base de datos y {len(latencias)} altas confirmadas"
+    assert compartido["colas"].longitud() == len(latencias), f"{nombre}: las colas no coinciden"
+    return len(latencias) / duracion, latencias, errores
+
+
+def _percentil(valores, percentil):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil))]
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    altas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"{hilos} hilos x {altas} altas")
+    with tempfile.TemporaryDirectory() as directorio:
+        for un_origen, (nombre, max_operaciones, espera_ms) in itertools.product((False, True), MODOS):
+            rendimiento, latencias, errores = ejecutar(directorio, nombre, max_operaciones, espera_ms, hilos, altas,
+                                                       un_origen)
+            print(f"{nombre:18} {'un origen' if un_origen else 'repartido':10} altas/s={rendimiento:>8.0f} "
+                  f"p50={statistics.median(latencias) * 1000:>7.2f} ms "
+                  f"p99={_percentil(latencias, 0.99) * 1000:>7.2f} ms errores={len(errores)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Comprueba que la exportación en streaming usa memoria constante.
+
+Genera dos bases de datos SQLite temporales (una 10 veces mayor que la otra) y
+dos juegos de colas por origen con los mismos tamaños, exporta cada fuente como
+NDJSON y CSV (con y sin gzip) y mide con tracemalloc el pico de memoria de la
+exportación (las colas ya están en memoria antes de empezar a medir). Falla si el
+pico crece con el tamaño de la tabla o de las colas.
+
+Uso: python rendimiento/bench_exportacion.py [vuelos_tabla_pequenia]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos_prueba import crear_base_de_datos, datos_vuelo
+from colas_vuelos import ColasPorOrigen
+from exportador_vuelos import exportar_vuelos, filtrar_vuelos, iterar_vuelos_db
+
+# Margen tolerado entre el pico de la tabla grande y el de la pequeña
+FACTOR_MAXIMO = 1.5
+
+
+def crear_colas(cantidad):
+    """Colas por origen con la cantidad de vuelos indicada (objetos ligeros con los campos exportados)"""
+    colas = ColasPorOrigen()
+    for indice in range(cantidad):
+        vuelo = SimpleNamespace(id=indice + 1, **datos_vuelo(indice))
+        cola = colas.obtener(vuelo.origen, crear=True)
+        if vuelo.es_emergencia:
+            cola.lista.insertar_al_frente(vuelo)
+        else:
+            cola.lista.insertar_al_final(vuelo)
+    for cola in colas.todas():
+        cola.publicar()
+    return colas
+
+
+def medir_exportacion(iterar_vuelos, formato, comprimir):
+    """Consume la exportación completa y retorna (bytes generados, pico de memoria, segundos)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    fragmentos, _, _ = exportar_vuelos(iterar_vuelos(), formato, comprimir)
+    total = sum(len(fragmento) for fragmento in fragmentos)
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, pico, duracion
+
+
+def main():
+    cantidad_pequenia = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cantidades = (cantidad_pequenia, cantidad_pequenia * 10)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        fuentes = {"db": {}, "cola": {}}
+        for cantidad in cantidades:
+            fabrica = crear_base_de_datos(os.path.join(directorio, f"vuelos_{cantidad}.db"), cantidad)
+            colas = crear_colas(cantidad)
+            fuentes["db"][cantidad] = lambda fabrica=fabrica: iterar_vuelos_db({}, fabrica_sesion=fabrica)
+            # Igual que GET /vuelos/exportar?fuente=cola
+            fuentes["cola"][cantidad] = lambda colas=colas: filtrar_vuelos(colas.iterar_global(), {})
+
+        fallos = []
+        for fuente, iteradores in fuentes.items():
+            for formato in ("ndjson", "csv"):
+                for comprimir in (False, True):
+                    picos = []
+                    for cantidad in cantidades:
+                        total, pico, duracion = medir_exportacion(iteradores[cantidad], formato, comprimir)
+                        picos.append(pico)
+                        print(f"{fuente:4} {formato:6} gzip={comprimir!s:5} vuelos={cantidad:>8} "
+                              f"bytes={total:>12} pico={pico / 1024:>8.1f} KiB tiempo={duracion:.2f}s")
+                    if picos[1] > picos[0] * FACTOR_MAXIMO:
+                        fallos.append(f"{fuente} {formato} gzip={comprimir}: {picos[0]} -> {picos[1]} bytes")
+
+    assert not fallos, "El pico de memoria crece con el número de vuelos: " + "; ".join(fallos)
+    print("OK: el pico de memoria no depende del número de vuelos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Prueba de estrés y comparación de rendimiento de las lecturas por instantáneas.
+
+Varios hilos escritores insertan, extraen e intercambian vuelos en una ColaOrigen
+mientras muchos hilos lectores recorren la cola. Se ejecuta en dos modos:
+
+- instantanea: los lectores usan la instantánea publicada (sin bloqueo).
+- bloqueo: los lectores toman el mismo bloqueo que los escritores y recorren la lista.
+
+En ambos modos se comprueban invariantes en cada lectura (tamaño coherente, sin IDs
+repetidos, versiones que nunca retroceden) y al final los enlaces de la lista en
+ambos sentidos. Falla si se detecta alguna violación.
+
+Uso: python rendimiento/bench_instantaneas.py [segundos] [lectores] [escritores] [vuelos_iniciales]
+"""
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colas_vuelos import ColaOrigen
+
+
+def _vuelo(id_vuelo):
+    return SimpleNamespace(
+        id=id_vuelo, numero_vuelo=f"LA{id_vuelo % 10000:04d}", estado="programado",
+        es_emergencia=id_vuelo % 20 == 0, hora_programada=datetime.now() + timedelta(minutes=id_vuelo)
+    )
+
+
+def _verificar_lista(lista):
+    """Comprueba que los enlaces siguiente/anterior y el tamaño son coherentes"""
+    adelante = []
+    actual = lista.cabeza
+    while actual:
+        adelante.append(actual.vuelo.id)
+        actual = actual.siguiente
+    atras = []
+    actual = lista.cola
+    while actual:
+        atras.append(actual.vuelo.id)
+        actual = actual.anterior
+    assert adelante == list(reversed(atras)), "Enlaces anterior/siguiente incoherentes"
+    assert len(adelante) == lista.longitud(), "Tamaño de la lista incoherente"
+    assert len(set(adelante)) == len(adelante), "Vuelos repetidos en la lista"
+
+
+def _escritor(cola, ids, detener, contador, semilla):
+    aleatorio = random.Random(semilla)
+    while not detener.is_set():
+        with cola.escritura() as lista:
+            operacion = aleatorio.random()
+            tamanio = lista.longitud()
+            if operacion < 0.4 or tamanio < 2:
+                lista.insertar_en_posicion(_vuelo(next(ids)), aleatorio.randint(0, tamanio))
+            elif operacion < 0.75:
+                lista.extraer_de_posicion(aleatorio.randrange(tamanio))
+            else:
+                lista.intercambiar_nodos(aleatorio.randrange(tamanio), aleatorio.randrange(tamanio))
+        contador[0] += 1
+
+
+def _lector_instantanea(cola, detener, contador, errores):
+    version_anterior = -1
+    while not detener.is_set():
+        instantanea = cola.instantanea
+        vuelos = instantanea.vuelos
+        if instantanea.version < version_anterior:
+            errores.append("La versión de la instantánea retrocedió")
+        if len({v.id for v in vuelos}) != len(vuelos):
+            errores.append("Vuelos repetidos en la instantánea")
+        version_anterior = instantanea.version
+        contador[0] += 1
+
+
+def _lector_bloqueo(cola, detener, contador, errores):
+    while not detener.is_set():
+        with cola.lock:
+            vuelos = cola.lista.listar_todos()
+            tamanio = cola.lista.longitud()
+        if len(vuelos) != tamanio or len({v.id for v in vuelos}) != len(vuelos):
+            errores.append("Lectura incoherente con bloqueo")
+        contador[0] += 1
+
+
+def ejecutar(modo, segundos, lectores, escritores, iniciales):
+    """Ejecuta la prueba en un modo y retorna (lecturas/s, escrituras/s, errores)"""
+    cola = ColaOrigen("SCL")
+    ids = itertools.count(1)
+    with cola.escritura() as lista:
+        for _ in range(iniciales):
+            lista.insertar_al_final(_vuelo(next(ids)))
+
+    detener = threading.Event()
+    errores = []
+    contadores_lectura = [[0] for _ in range(lectores)]
+    contadores_escritura = [[0] for _ in range(escritores)]
+    lector = _lector_instantanea if modo == "instantanea" else _lector_bloqueo
+    hilos = [threading.Thread(target=lector, args=(cola, detener, c, errores)) for c in contadores_lectura]
+    hilos += [threading.Thread(target=_escritor, args=(cola, ids, detener, c, i))
+              for i, c in enumerate(contadores_escritura)]
+
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(segundos)
+    detener.set()
+    for hilo in hilos:
+        hilo.join()
+
+    with cola.lock:
+        _verificar_lista(cola.lista)
+        assert [v.id for v in cola.instantanea.vuelos] == [v.id for v in cola.lista.listar_todos()], \
+            "La última instantánea no coincide con la lista"
+
+    lecturas = sum(c[0] for c in contadores_lectura) / segundos
+    escrituras = sum(c[0] for c in contadores_escritura) / segundos
+    return lecturas, escrituras, errores
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    lectores = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    escritores = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    iniciales = int(sys.argv[4]) if len(sys.argv) > 4 else 500
+
+    resultados = {}
+    for modo in ("bloqueo", "instantanea"):
+        lecturas, escrituras, errores = ejecutar(modo, segundos, lectores, escritores, iniciales)
+        resultados[modo] = lecturas
+        print(f"{modo:12} lecturas/s={lecturas:>10.0f} escrituras/s={escrituras:>10.0f} errores={len(errores)}")
+        assert not errores, f"Invariantes violados en modo {modo}: {errores[:3]}"
+
+    print(f"lecturas: instantánea / bloqueo = {resultados['instantanea'] / max(resultados['bloqueo'], 1):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cliente HTTP/1.1 mínimo sobre asyncio para el generador de carga.
+
+Mantiene una conexión persistente (keep-alive) por instancia y entiende respuestas con
+Content-Length o con codificación chunked (las exportaciones en streaming). Solo usa la
+biblioteca estándar para que el generador no dependa de nada que no tenga la aplicación.
+"""
+import asyncio
+import json
+
+
+class ErrorHTTP(Exception):
+    """Respuesta que no se pudo leer o interpretar"""
+
+
+class ConexionHTTP:
+    """Conexión HTTP/1.1 persistente contra un servidor (se reabre si el servidor la cierra)"""
+
+    def __init__(self, host, puerto, tiempo_espera=30):
+        self.host = host
+        self.puerto = puerto
+        self.tiempo_espera = tiempo_espera
+        self._lector = None
+        self._escritor = None
+
+    async def _abrir(self):
+        self._lector, self._escritor = await asyncio.open_connection(self.host, self.puerto)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+        self._lector = None
+        self._escritor = None
+
+    async def peticion(self, metodo, ruta, cuerpo=None):
+        """Envía una petición y retorna (código de estado, cuerpo en bytes)"""
+        try:
+            return await asyncio.wait_for(self._peticion(metodo, ruta, cuerpo), self.tiempo_espera)
+        except BaseException:
+            # Tras un error la conexión puede haber quedado a medias: se descarta
+            self.cerrar()
+            raise
+
+    async def _peticion(self, metodo, ruta, cuerpo):
+        if self._escritor is None:
+            await self._abrir()
+
+        datos = b""
+        cabeceras = [f"{metodo} {ruta} HTTP/1.1", f"Host: {self.host}:{self.puerto}", "Connection: keep-alive"]
+        if cuerpo is not None:
+            datos = json.dumps(cuerpo).encode("utf-8")
+            cabeceras.append("Content-Type: application/json")
+        if cuerpo is not None or metodo in ("POST", "PUT", "PATCH"):
+            cabeceras.append(f"Content-Length: {len(datos)}")
+        self._escritor.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode("latin-1") + datos)
+        await self._escritor.drain()
+
+        codigo, cabeceras_respuesta = await self._leer_cabecera()
+        if cabeceras_respuesta.get("transfer-encoding", "").lower() == "chunked":
+            contenido = await self._leer_chunked()
+        else:
+            contenido = await self._lector.readexactly(int(cabeceras_respuesta.get("content-length", "0")))
+
+        if cabeceras_respuesta.get("connection", "").lower() == "close":
+            self.cerrar()
+        return codigo, contenido
+
+    async def _leer_cabecera(self):
+        linea_estado = await self._lector.readline()
+        if not linea_estado:
+            raise ErrorHTTP("El servidor cerró la conexión")
+        partes = linea_estado.decode("latin-1").split(" ", 2)
+        if len(partes) < 2 or not partes[0].startswith("HTTP/"):
+            raise ErrorHTTP(f"Línea de estado no válida: {linea_estado!r}")
+
+        cabeceras = {}
+        while True:
+            linea = await self._lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        return int(partes[1]), cabeceras
+
+    async def _leer_chunked(self):
+        fragmentos = []
+        while True:
+            linea = await self._lector.readline()
+            tamanio = int(linea.split(b";", 1)[0].strip() or b"0", 16)
+            if tamanio == 0:
+                # Consumir las cabeceras finales (trailers) hasta la línea vacía
+                while (await self._lector.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(fragmentos)
+            fragmentos.append(await self._lector.readexactly(tamanio))
+            await self._lector.readline()
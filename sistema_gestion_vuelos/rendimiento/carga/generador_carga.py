@@ -0,0 +1,338 @@
+"""Generador de carga extremo a extremo contra la API de vuelos.
+
+Lanza uvicorn con api.py sobre una base de datos SQLite temporal (con los vuelos
+iniciales del escenario), espera a que /salud/listo responda 200 y reproduce durante
+un tiempo fijo la mezcla de operaciones de un archivo de escenario (ver escenarios/).
+El servidor se lanza con un único proceso (ver BloqueoProceso en bloqueo_proceso.py).
+
+Las peticiones llegan a la tasa indicada (proceso de Poisson o intervalos fijos) con
+independencia de lo que tarde el servidor, y la latencia se mide desde el instante en
+que cada petición debía salir: si el servidor se satura, la espera en cola cuenta como
+latencia. Al final se informa por operación de p50/p95/p99, rendimiento y tasa de error.
+
+El escenario se compone de:
+
+- duracion_segundos, tasa_por_segundo, llegadas ("poisson" o "constante"),
+  conexiones (conexiones keep-alive simultáneas), vuelos_iniciales y entorno
+  (variables de entorno para el servidor, p. ej. COMMIT_AGRUPADO).
+- operaciones: lista de {nombre, peso, metodo, ruta, cuerpo, repeticiones,
+  estados_esperados, valores}. La ruta y el cuerpo son plantillas con los campos
+  {origen}, {destino}, {aerolinea}, {id_vuelo}, {numero_nuevo}, {hora} y {estado};
+  valores permite restringir las opciones de cualquiera de ellos. repeticiones > 1
+  lanza una ráfaga de peticiones simultáneas.
+
+Uso: python rendimiento/carga/generador_carga.py ESCENARIO [--duracion S] [--tasa R]
+     [--entorno CLAVE=VALOR ...] [--url http://host:puerto] [--salida resultados.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+DIRECTORIO_CARGA = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_RENDIMIENTO = os.path.dirname(DIRECTORIO_CARGA)
+DIRECTORIO_APP = os.path.dirname(DIRECTORIO_RENDIMIENTO)
+sys.path.insert(0, DIRECTORIO_RENDIMIENTO)
+
+from cliente_http import ConexionHTTP
+from datos_prueba import AEROLINEAS, ORIGENES, crear_base_de_datos, numero_vuelo
+
+ESTADOS_ACTUALIZABLES = ("programado", "abordando", "retrasado", "despegado")
+
+VALORES_POR_DEFECTO = {
+    "duracion_segundos": 30,
+    "tasa_por_segundo": 100,
+    "llegadas": "poisson",
+    "conexiones": 32,
+    "vuelos_iniciales": 5000,
+    "entorno": {},
+}
+
+
+def cargar_escenario(ruta):
+    """Lee un escenario JSON, completa los valores por defecto y comprueba las operaciones"""
+    with open(ruta, encoding="utf-8") as archivo:
+        escenario = {**VALORES_POR_DEFECTO, **json.load(archivo)}
+    escenario.setdefault("nombre", os.path.splitext(os.path.basename(ruta))[0])
+    if not escenario.get("operaciones"):
+        raise ValueError("El escenario no define operaciones")
+    for operacion in escenario["operaciones"]:
+        faltantes = {"nombre", "peso", "metodo", "ruta"} - operacion.keys()
+        if faltantes:
+            raise ValueError(f"Faltan campos en la operación {operacion}: {sorted(faltantes)}")
+    return escenario
+
+
+class GeneradorValores:
+    """Produce los valores con que se rellenan las plantillas de cada petición"""
+
+    def __init__(self, vuelos_iniciales, semilla=None):
+        self.aleatorio = random.Random(semilla)
+        # Los vuelos iniciales se insertan con IDs consecutivos desde 1
+        self.ids = list(range(1, vuelos_iniciales + 1))
+        self.siguiente_numero = vuelos_iniciales
+
+    def valores(self, restricciones=None):
+        origen, destino = self.aleatorio.sample(ORIGENES, 2)
+        hora = datetime.now() + timedelta(minutes=self.aleatorio.randint(30, 48 * 60))
+        valores = {
+            "origen": origen,
+            "destino": destino,
+            "aerolinea": self.aleatorio.choice(AEROLINEAS),
+            "id_vuelo": self.aleatorio.choice(self.ids) if self.ids else 0,
+            "numero_nuevo": numero_vuelo(self.siguiente_numero),
+            "hora": hora.isoformat(timespec="seconds"),
+            "estado": self.aleatorio.choice(ESTADOS_ACTUALIZABLES),
+        }
+        self.siguiente_numero += 1
+        for campo, opciones in (restricciones or {}).items():
+            valores[campo] = self.aleatorio.choice(opciones)
+        return valores
+
+    def registrar_creado(self, id_vuelo):
+        self.ids.append(id_vuelo)
+
+
+def rellenar(plantilla, valores):
+    """Sustituye los campos {nombre} en las cadenas de una plantilla (recorre dicts y listas)"""
+    if isinstance(plantilla, str):
+        return plantilla.format(**valores)
+    if isinstance(plantilla, dict):
+        return {clave: rellenar(valor, valores) for clave, valor in plantilla.items()}
+    if isinstance(plantilla, list):
+        return [rellenar(valor, valores) for valor in plantilla]
+    return plantilla
+
+
+async def _lanzar(operacion, programado, conexiones, generador, resultados):
+    valores = generador.valores(operacion.get("valores"))
+    ruta = rellenar(operacion["ruta"], valores)
+    cuerpo = rellenar(operacion.get("cuerpo"), valores)
+
+    conexion = await conexiones.get()
+    try:
+        codigo, contenido = await conexion.peticion(operacion["metodo"], ruta, cuerpo)
+    except Exception:
+        codigo, contenido = None, b""
+    finally:
+        conexiones.put_nowait(conexion)
+    latencia = time.perf_counter() - programado
+
+    registro = resultados[operacion["nombre"]]
+    registro["latencias"].append(latencia)
+    esperados = operacion.get("estados_esperados")
+    correcto = codigo is not None and (codigo in esperados if esperados else 200 <= codigo < 300)
+    if not correcto:
+        registro["errores"] += 1
+        registro["codigos"][str(codigo)] += 1
+
+    # Los vuelos creados pasan a poder usarse en actualizaciones y borrados
+    if codigo == 201 and operacion["metodo"] == "POST":
+        try:
+            creado = json.loads(contenido)
+        except ValueError:
+            return
+        if isinstance(creado, dict) and "id" in creado:
+            generador.registrar_creado(creado["id"])
+
+
+async def ejecutar_escenario(escenario, host, puerto, semilla=None):
+    """Reproduce el escenario y retorna (resultados por operación, segundos transcurridos)"""
+    aleatorio = random.Random(semilla)
+    generador = GeneradorValores(escenario["vuelos_iniciales"], semilla)
+    operaciones = escenario["operaciones"]
+    pesos = [operacion["peso"] for operacion in operaciones]
+    tasa = escenario["tasa_por_segundo"]
+    duracion = escenario["duracion_segundos"]
+
+    conexiones = asyncio.Queue()
+    for _ in range(escenario["conexiones"]):
+        conexiones.put_nowait(ConexionHTTP(host, puerto))
+    resultados = defaultdict(lambda: {"latencias": [], "errores": 0, "codigos": defaultdict(int)})
+    pendientes = set()
+
+    inicio = time.perf_counter()
+    programado = inicio
+    while True:
+        if escenario["llegadas"] == "poisson":
+            programado += aleatorio.expovariate(tasa)
+        else:
+            programado += 1 / tasa
+        if programado - inicio >= duracion:
+            break
+        espera = programado - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+        operacion = aleatorio.choices(operaciones, weights=pesos)[0]
+        for _ in range(operacion.get("repeticiones", 1)):
+            tarea = asyncio.create_task(_lanzar(operacion, programado, conexiones, generador, resultados))
+            pendientes.add(tarea)
+            tarea.add_done_callback(pendientes.discard)
+
+    await asyncio.gather(*pendientes)
+    transcurrido = time.perf_counter() - inicio
+    while not conexiones.empty():
+        conexiones.get_nowait().cerrar()
+    return resultados, transcurrido
+
+
+def _percentil(ordenados, percentil):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil))]
+
+
+def resumir(resultados, transcurrido):
+    """Calcula por operación (y en total) percentiles de latencia, rendimiento y tasa de error"""
+    resumen = {}
+    todas = []
+    errores_totales = 0
+    for nombre, registro in resultados.items():
+        latencias = sorted(registro["latencias"])
+        todas.extend(latencias)
+        errores_totales += registro["errores"]
+        resumen[nombre] = {
+            "peticiones": len(latencias),
+            "por_segundo": len(latencias) / transcurrido,
+            "p50_ms": _percentil(latencias, 0.50) * 1000,
+            "p95_ms": _percentil(latencias, 0.95) * 1000,
+            "p99_ms": _percentil(latencias, 0.99) * 1000,
+            "tasa_error": registro["errores"] / len(latencias),
+            "codigos_error": dict(registro["codigos"]),
+        }
+    if todas:
+        todas.sort()
+        resumen["TOTAL"] = {
+            "peticiones": len(todas),
+            "por_segundo": len(todas) / transcurrido,
+            "p50_ms": _percentil(todas, 0.50) * 1000,
+            "p95_ms": _percentil(todas, 0.95) * 1000,
+            "p99_ms": _percentil(todas, 0.99) * 1000,
+            "tasa_error": errores_totales / len(todas),
+            "codigos_error": {},
+        }
+    return resumen
+
+
+def imprimir_resumen(resumen):
+    print(f"{'operación':24} {'peticiones':>10} {'pet/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'error %':>8}")
+    for nombre, fila in resumen.items():
+        print(f"{nombre:24} {fila['peticiones']:>10} {fila['por_segundo']:>9.1f} {fila['p50_ms']:>9.2f} "
+              f"{fila['p95_ms']:>9.2f} {fila['p99_ms']:>9.2f} {fila['tasa_error'] * 100:>8.2f}")
+        if fila["codigos_error"]:
+            print(f"{'':24} códigos con error: {fila['codigos_error']}")
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_listo(base, proceso, limite=120):
+    """Espera a que /salud/listo responda 200"""
+    inicio = time.perf_counter()
+    while True:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de estar listo")
+        if time.perf_counter() - inicio > limite:
+            raise RuntimeError("El servidor no estuvo listo a tiempo")
+        try:
+            with urllib.request.urlopen(f"{base}/salud/listo", timeout=1) as respuesta:
+                if respuesta.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.05)
+
+
+def lanzar_servidor(directorio, escenario, entorno_extra):
+    """Crea la base de datos temporal, lanza uvicorn y retorna (proceso, puerto) cuando está listo"""
+    ruta = os.path.join(directorio, "carga.db")
+    crear_base_de_datos(ruta, escenario["vuelos_iniciales"])
+
+    entorno = dict(os.environ)
+    entorno.update({"DATABASE_URL": f"sqlite:///{ruta}", "LOG_LEVEL": "WARNING"})
+    entorno.update({clave: str(valor) for clave, valor in escenario["entorno"].items()})
+    entorno.update(entorno_extra)
+
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(puerto),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=DIRECTORIO_APP, env=entorno
+    )
+    try:
+        _esperar_listo(f"http://127.0.0.1:{puerto}", proceso)
+    except Exception:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+        raise
+    return proceso, puerto
+
+
+def _argumentos():
+    analizador = argparse.ArgumentParser(description="Generador de carga para la API de vuelos")
+    analizador.add_argument("escenario", help="Archivo JSON con el escenario")
+    analizador.add_argument("--duracion", type=float, help="Sustituye duracion_segundos del escenario")
+    analizador.add_argument("--tasa", type=float, help="Sustituye tasa_por_segundo del escenario")
+    analizador.add_argument("--entorno", action="append", default=[], metavar="CLAVE=VALOR",
+                            help="Variable de entorno adicional para el servidor (repetible)")
+    analizador.add_argument("--url", help="Usar un servidor ya lanzado en lugar de lanzar uno")
+    analizador.add_argument("--semilla", type=int, help="Semilla para reproducir la misma secuencia")
+    analizador.add_argument("--salida", help="Guardar el resumen en este archivo JSON")
+    return analizador.parse_args()
+
+
+def main():
+    argumentos = _argumentos()
+    escenario = cargar_escenario(argumentos.escenario)
+    if argumentos.duracion is not None:
+        escenario["duracion_segundos"] = argumentos.duracion
+    if argumentos.tasa is not None:
+        escenario["tasa_por_segundo"] = argumentos.tasa
+    entorno_extra = dict(variable.split("=", 1) for variable in argumentos.entorno)
+    entorno = {**escenario["entorno"], **entorno_extra}
+
+    print(f"escenario {escenario['nombre']}: {escenario['tasa_por_segundo']} pet/s durante "
+          f"{escenario['duracion_segundos']} s, {escenario['conexiones']} conexiones, entorno={entorno}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso = None
+        if argumentos.url:
+            destino = urlsplit(argumentos.url)
+            host, puerto = destino.hostname, destino.port or 80
+        else:
+            proceso, puerto = lanzar_servidor(directorio, escenario, entorno_extra)
+            host = "127.0.0.1"
+        try:
+            resultados, transcurrido = asyncio.run(ejecutar_escenario(escenario, host, puerto, argumentos.semilla))
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+
+    resumen = resumir(resultados, transcurrido)
+    imprimir_resumen(resumen)
+    if argumentos.salida:
+        with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "escenario": escenario["nombre"],
+                "entorno": entorno,
+                "tasa_por_segundo": escenario["tasa_por_segundo"],
+                "duracion_segundos": transcurrido,
+                "resultados": resumen,
+            }, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Utilidades compartidas por los scripts de rendimiento para generar datos de prueba."""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from modelos import Vuelo, inicializar_base_de_datos
+
+ORIGENES = ("SCL", "MAD", "BCN", "LIM", "EZE", "GRU")
+AEROLINEAS = ("LA", "IB", "AR", "AV")
+
+
+def numero_vuelo(indice):
+    """Número de vuelo válido y único para cada índice (hasta 26*26*10000 vuelos)"""
+    return f"{chr(65 + indice // 260000 % 26)}{chr(65 + indice // 10000 % 26)}{indice % 10000:04d}"
+
+
+def datos_vuelo(indice, base=None):
+    """Datos de un vuelo de prueba repartido entre varios orígenes y aerolíneas"""
+    base = base or datetime.now() + timedelta(days=1)
+    return {
+        "numero_vuelo": numero_vuelo(indice),
+        "aerolinea": AEROLINEAS[indice % len(AEROLINEAS)],
+        "origen": ORIGENES[indice % len(ORIGENES)],
+        "destino": ORIGENES[(indice + 1) % len(ORIGENES)],
+        "hora_programada": base + timedelta(minutes=indice),
+        "es_emergencia": indice % 50 == 0,
+        "estado": "programado",
+    }
+
+
+def crear_base_de_datos(ruta, cantidad):
+    """Crea (con el esquema actual) una base de datos SQLite con la cantidad de vuelos indicada
+    y retorna una fábrica de sesiones ligada a ella"""
+    motor = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    inicializar_base_de_datos(motor)
+    base = datetime.now() + timedelta(days=1)
+    with motor.begin() as conexion:
+        for inicio in range(0, cantidad, 10000):
+            fin = min(inicio + 10000, cantidad)
+            conexion.execute(insert(Vuelo), [datos_vuelo(i, base) for i in range(inicio, fin)])
+    return sessionmaker(bind=motor, expire_on_commit=False)
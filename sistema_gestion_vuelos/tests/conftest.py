@@ -0,0 +1,64 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Los módulos de la aplicación se importan por su nombre, como hace uvicorn desde su directorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+import modelos
+from cache_referencias import CacheReferencias
+from colas_vuelos import ColasPorOrigen
+from estadisticas_vuelos import ContadoresVuelos
+from modelos import inicializar_base_de_datos
+
+
+@pytest.fixture
+def motor(tmp_path):
+    """Motor de una base de datos SQLite temporal con el esquema actual"""
+    motor = create_engine(f"sqlite:///{tmp_path / 'vuelos.db'}", connect_args={"check_same_thread": False})
+    inicializar_base_de_datos(motor)
+    yield motor
+    motor.dispose()
+
+
+@pytest.fixture
+def fabrica_sesion(motor):
+    """Fábrica de sesiones sobre la base de datos temporal"""
+    return sessionmaker(bind=motor, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def cliente(motor, monkeypatch):
+    """Cliente de la API sobre la base de datos temporal, con colas, contadores y caché propios.
+
+    No ejecuta el ciclo de vida (bloqueo de proceso, precalentamiento ni archivador): las
+    colas se cargan en la primera petición.
+    """
+    monkeypatch.setattr(modelos, "_motor", motor)
+    modelos._fabrica_sesiones.configure(bind=motor)
+    monkeypatch.setattr(api, "cache_referencias", CacheReferencias())
+    monkeypatch.setattr(api, "contadores_vuelos", ContadoresVuelos())
+    monkeypatch.setattr(api, "colas_vuelos", ColasPorOrigen())
+    monkeypatch.setattr(api, "escritor_agrupado", None)
+    return TestClient(api.app)
+
+
+def datos_vuelo(indice, origen="SCL", destino="MAD", horas=1, **otros):
+    """Datos válidos de un vuelo de prueba"""
+    datos = {
+        "numero_vuelo": f"LA{1000 + indice}",
+        "aerolinea": "LA",
+        "origen": origen,
+        "destino": destino,
+        "hora_programada": datetime.now() + timedelta(hours=horas),
+        "es_emergencia": False,
+        "estado": "programado",
+    }
+    datos.update(otros)
+    return datos
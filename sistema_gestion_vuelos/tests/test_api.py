@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+
+def _crear(cliente, numero_vuelo, origen="MAD", destino="BCN", horas=1, **otros):
+    hora = (datetime.now() + timedelta(hours=horas)).isoformat()
+    respuesta = cliente.post("/vuelos/", json=dict(numero_vuelo=numero_vuelo, aerolinea="IB", origen=origen,
+                                                   destino=destino, hora_programada=hora, **otros))
+    assert respuesta.status_code == 201, respuesta.text
+    return respuesta.json()
+
+
+def test_actualizar_valida_origen_y_destino_con_los_valores_guardados(cliente):
+    vuelo = _crear(cliente, "IB1000")
+
+    assert cliente.put(f"/vuelos/{vuelo['id']}", json={"destino": "MAD"}).status_code == 422
+    assert cliente.put(f"/vuelos/{vuelo['id']}", json={"origen": "BCN"}).status_code == 422
+    assert cliente.put("/vuelos/999", json={"destino": "SCL"}).status_code == 404
+    assert cliente.get(f"/vuelos/{vuelo['id']}").json()["destino"] == "BCN"
+
+    respuesta = cliente.put(f"/vuelos/{vuelo['id']}", json={"origen": "BCN", "destino": "MAD"})
+    assert respuesta.status_code == 200
+    assert (respuesta.json()["origen"], respuesta.json()["destino"]) == ("BCN", "MAD")
+
+
+def test_total_y_estadisticas_cuentan_tambien_los_cancelados(cliente):
+    # Todos a las 10:30 de mañana, para que caigan en la misma hora de salida
+    horas = ((datetime.now() + timedelta(days=1)).replace(hour=10, minute=30) - datetime.now()) / timedelta(hours=1)
+    _crear(cliente, "IB1000", horas=horas)
+    _crear(cliente, "IB1001", horas=horas, estado="cancelado")
+    _crear(cliente, "IB1002", origen="SCL", horas=horas, estado="retrasado")
+
+    assert cliente.get("/vuelos/total").json() == {"total": 3}
+    assert cliente.get("/vuelos/total", params={"origen": "MAD"}).json() == {"total": 2}
+    estadisticas = cliente.get("/vuelos/estadisticas").json()
+    assert estadisticas["total"] == 3
+    assert estadisticas["por_estado"] == {"programado": 1, "cancelado": 1, "retrasado": 1}
+    assert cliente.get("/vuelos/estadisticas/retrasos").json() == [
+        {"aerolinea": "IB", "hora": 10, "tasa_retraso": 1 / 3}
+    ]
+    # Las colas, en cambio, no tienen el cancelado
+    assert [vuelo["numero_vuelo"] for vuelo in cliente.get("/vuelos/").json()] == ["IB1000", "IB1002"]
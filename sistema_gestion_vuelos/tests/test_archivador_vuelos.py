@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from archivador_vuelos import ArchivadorVuelos
+from conftest import datos_vuelo
+from modelos import HistorialVuelo, Vuelo, VueloArchivado, inicializar_base_de_datos
+
+
+def _crear_vuelo(fabrica_sesion, indice, **otros):
+    sesion = fabrica_sesion()
+    try:
+        vuelo = Vuelo(**dict(datos_vuelo(indice, horas=-100, estado="despegado"), **otros))
+        sesion.add(vuelo)
+        sesion.commit()
+        return vuelo.id
+    finally:
+        sesion.close()
+
+
+def test_los_ids_de_los_vuelos_archivados_no_se_reutilizan(fabrica_sesion):
+    archivador = ArchivadorVuelos(fabrica_sesion, retencion_horas=48)
+    id_vuelo = _crear_vuelo(fabrica_sesion, 0)
+    assert [vuelo.id_original for vuelo in archivador.archivar_lote()] == [id_vuelo]
+
+    # Aunque la tabla de vuelos quede vacía, el siguiente vuelo no toma el mismo ID
+    id_siguiente = _crear_vuelo(fabrica_sesion, 1)
+    assert id_siguiente > id_vuelo
+    assert [vuelo.id_original for vuelo in archivador.archivar_lote()] == [id_siguiente]
+    sesion = fabrica_sesion()
+    assert sesion.query(VueloArchivado).filter(VueloArchivado.id_original == id_vuelo).count() == 1
+    assert sesion.query(Vuelo).count() == 0
+
+
+def test_archivar_elimina_el_historial_de_los_vuelos_archivados(fabrica_sesion):
+    id_archivado = _crear_vuelo(fabrica_sesion, 0)
+    id_reciente = _crear_vuelo(fabrica_sesion, 1, hora_programada=datetime.now())
+    sesion = fabrica_sesion()
+    sesion.add_all([HistorialVuelo(vuelo_id=id_vuelo, estado_anterior="programado", estado_nuevo="despegado")
+                    for id_vuelo in (id_archivado, id_reciente)])
+    sesion.commit()
+
+    ArchivadorVuelos(fabrica_sesion, retencion_horas=48).archivar_lote()
+
+    assert [registro.vuelo_id for registro in fabrica_sesion().query(HistorialVuelo)] == [id_reciente]
+
+
+def test_la_migracion_deja_de_reutilizar_ids_de_una_tabla_anterior(tmp_path):
+    motor = create_engine(f"sqlite:///{tmp_path / 'vuelos.db'}")
+    with motor.begin() as conexion:
+        conexion.execute(text("CREATE TABLE vuelos (id INTEGER PRIMARY KEY, numero_vuelo VARCHAR, estado VARCHAR)"))
+        conexion.execute(text("INSERT INTO vuelos (id, numero_vuelo, estado) VALUES (1, 'LA1001', 'programado')"))
+        conexion.execute(text(
+            "CREATE TABLE vuelos_archivados (id INTEGER PRIMARY KEY, id_original INTEGER, numero_vuelo VARCHAR)"
+        ))
+        conexion.execute(text("INSERT INTO vuelos_archivados (id, id_original, numero_vuelo) VALUES (1, 5, 'LA1005')"))
+
+    inicializar_base_de_datos(motor)
+
+    with motor.begin() as conexion:
+        assert conexion.execute(text("SELECT id, numero_vuelo, posicion_cola FROM vuelos")).all() == [(1, "LA1001", None)]
+        conexion.execute(text("INSERT INTO vuelos (numero_vuelo) VALUES ('LA1006')"))
+        assert conexion.execute(text("SELECT MAX(id) FROM vuelos")).scalar() == 6
+    motor.dispose()
+
+
+def test_la_migracion_conserva_el_id_de_los_vuelos_ya_archivados(tmp_path):
+    motor = create_engine(f"sqlite:///{tmp_path / 'vuelos.db'}")
+    with motor.begin() as conexion:
+        conexion.execute(text(
+            "CREATE TABLE vuelos_archivados (id INTEGER PRIMARY KEY, numero_vuelo VARCHAR, "
+            "estado VARCHAR, fecha_archivo DATETIME)"
+        ))
+        conexion.execute(text(
+            "INSERT INTO vuelos_archivados (id, numero_vuelo, estado, fecha_archivo) "
+            "VALUES (7, 'LA1007', 'despegado', :fecha)"
+        ), {"fecha": datetime.now() - timedelta(days=1)})
+
+    inicializar_base_de_datos(motor)
+
+    with motor.connect() as conexion:
+        assert conexion.execute(text("SELECT id, id_original FROM vuelos_archivados")).all() == [(7, 7)]
+    motor.dispose()
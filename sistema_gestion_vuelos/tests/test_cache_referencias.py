@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from cache_referencias import CacheReferencias
+from conftest import datos_vuelo
+from modelos import Aerolinea, Aeropuerto
+
+
+def _registrar(fabrica_sesion):
+    with fabrica_sesion() as sesion:
+        sesion.add(Aerolinea(codigo="IB", nombre="Iberia", pais_origen="España"))
+        sesion.add(Aeropuerto(codigo_iata="MAD", nombre="Barajas", ciudad="Madrid", pais="España"))
+        sesion.commit()
+
+
+def test_enriquecer_solo_busca_codigos_de_aerolinea_con_formato_valido(fabrica_sesion):
+    _registrar(fabrica_sesion)
+    cache = CacheReferencias()
+    vuelos = [
+        SimpleNamespace(id=1, **datos_vuelo(1, origen="MAD", destino="BCN", aerolinea="Iberia", numero_vuelo="IB1001")),
+        SimpleNamespace(id=2, **datos_vuelo(2, origen="MAD", destino="BCN", aerolinea=None, numero_vuelo="XX1002")),
+    ]
+
+    enriquecidos = cache.enriquecer_vuelos(fabrica_sesion(), vuelos)
+
+    # La primera se resuelve por el prefijo del número de vuelo
+    assert [vuelo["nombre_aerolinea"] for vuelo in enriquecidos] == ["Iberia", None]
+    assert [vuelo["ciudad_origen"] for vuelo in enriquecidos] == ["Madrid", "Madrid"]
+    # "Iberia" y None no son códigos: no ocupan entradas de la caché
+    assert set(cache._aerolineas.entradas) == {"IB", "XX"}
+
+
+class _SesionConEscrituraConcurrente:
+    """Sesión que, entre las dos consultas de aerolíneas de la precarga, renombra una
+    aerolínea e invalida su entrada, como haría una petición concurrente"""
+
+    def __init__(self, sesion, fabrica_sesion, cache):
+        self.sesion = sesion
+        self.fabrica_sesion = fabrica_sesion
+        self.cache = cache
+        self.consultas = 0
+
+    def query(self, *entidades):
+        self.consultas += 1
+        if self.consultas == 2:
+            with self.fabrica_sesion() as otra:
+                otra.query(Aerolinea).filter(Aerolinea.codigo == "IB").update({"nombre": "Iberia Express"})
+                otra.commit()
+            self.cache.invalidar_aerolinea("IB")
+        return self.sesion.query(*entidades)
+
+
+def test_precargar_descarta_lo_leido_si_hubo_una_invalidacion(fabrica_sesion):
+    _registrar(fabrica_sesion)
+    cache = CacheReferencias()
+
+    cache.precargar(_SesionConEscrituraConcurrente(fabrica_sesion(), fabrica_sesion, cache))
+
+    assert cache.obtener_aerolinea(fabrica_sesion(), "IB")["nombre"] == "Iberia Express"
+    # Los aeropuertos, sin invalidaciones, sí quedan precargados
+    assert cache.codigos_aeropuertos(None) == frozenset({"MAD"})
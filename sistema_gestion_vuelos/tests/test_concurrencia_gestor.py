@@ -0,0 +1,192 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from archivador_vuelos import ArchivadorVuelos
+from colas_vuelos import ColasPorOrigen
+from conftest import datos_vuelo
+from escritura_agrupada import EscritorAgrupado
+from estadisticas_vuelos import ContadoresVuelos
+from gestor_vuelos import GestorVuelos
+from modelos import Vuelo
+
+# Versión reducida de rendimiento/bench_instantaneas.py sobre las escrituras reales de
+# GestorVuelos: operaciones por escritor, escritores y lectores
+OPERACIONES = 60
+ESCRITORES = 4
+LECTORES = 2
+
+ORIGENES = ("SCL", "LIM", "BCN")
+
+
+def _verificar_lista(lista):
+    """Comprueba que los enlaces siguiente/anterior y el tamaño son coherentes"""
+    adelante = []
+    actual = lista.cabeza
+    while actual:
+        adelante.append(actual.vuelo.id)
+        actual = actual.siguiente
+    atras = []
+    actual = lista.cola
+    while actual:
+        atras.append(actual.vuelo.id)
+        actual = actual.anterior
+    assert adelante == list(reversed(atras)), "Enlaces anterior/siguiente incoherentes"
+    assert len(adelante) == lista.longitud(), "Tamaño de la lista incoherente"
+
+
+class _Prueba:
+    """Estado compartido por los hilos: cada operación usa su propia sesión, como una petición.
+
+    Cada escritor solo modifica sus propios vuelos (la API no protege contra dos
+    actualizaciones simultáneas del mismo vuelo), pero todos reordenan las mismas colas.
+    """
+
+    def __init__(self, fabrica_sesion, escritor):
+        self.fabrica_sesion = fabrica_sesion
+        self.escritor = escritor
+        self.colas = ColasPorOrigen()
+        self.contadores = ContadoresVuelos()
+        self.detener = threading.Event()
+        self.errores = []
+        self.siguiente_indice = iter(range(1000, 100000))
+        self.lock_indice = threading.Lock()
+
+    def ejecutar(self, operacion):
+        sesion = self.fabrica_sesion()
+        try:
+            return operacion(GestorVuelos(sesion, contadores=self.contadores, colas=self.colas,
+                                          escritor=self.escritor))
+        finally:
+            sesion.close()
+
+    def nuevo_vuelo(self, aleatorio):
+        with self.lock_indice:
+            indice = next(self.siguiente_indice)
+        return datos_vuelo(indice, origen=aleatorio.choice(ORIGENES), horas=aleatorio.uniform(1, 48),
+                           es_emergencia=aleatorio.random() < 0.1)
+
+    def ids_en_cola(self, origen):
+        cola = self.colas.obtener(origen)
+        return [vuelo.id for vuelo in cola.instantanea.vuelos] if cola is not None else []
+
+    def propios(self, ids, semilla):
+        return [id_vuelo for id_vuelo in ids if id_vuelo % ESCRITORES == semilla]
+
+
+def _escritor(prueba, semilla):
+    aleatorio = random.Random(semilla)
+    archivador = ArchivadorVuelos(prueba.fabrica_sesion, retencion_horas=48)
+    try:
+        for _ in range(OPERACIONES):
+            origen = aleatorio.choice(ORIGENES)
+            ids = prueba.ids_en_cola(origen)
+            propios = prueba.propios(ids, semilla)
+            operacion = aleatorio.random()
+            if operacion < 0.2 or not propios:
+                prueba.ejecutar(lambda g: g.agregar_vuelo(prueba.nuevo_vuelo(aleatorio)))
+            elif operacion < 0.3:
+                datos = prueba.nuevo_vuelo(aleatorio)
+                posicion = aleatorio.randint(0, len(ids))
+                try:
+                    prueba.ejecutar(lambda g: g.insertar_vuelo_en_posicion(datos, posicion))
+                except IndexError:
+                    pass  # La cola se acortó desde que se leyó
+            elif operacion < 0.6:
+                # Cambios que mueven el vuelo (de hora, de cola, dentro o fuera de ella) o no
+                cambio = aleatorio.choice([
+                    {"hora_programada": datetime.now() + timedelta(hours=aleatorio.uniform(1, 48))},
+                    {"origen": aleatorio.choice(ORIGENES)},
+                    {"es_emergencia": aleatorio.random() < 0.5},
+                    {"estado": aleatorio.choice(["retrasado", "cancelado", "abordando"])},
+                ])
+                prueba.ejecutar(lambda g: g.actualizar_vuelo(aleatorio.choice(propios), cambio))
+            elif operacion < 0.7:
+                # Un vuelo cancelado vuelve a su cola
+                with prueba.fabrica_sesion() as sesion:
+                    cancelados = prueba.propios([id_vuelo for (id_vuelo,) in
+                                                 sesion.query(Vuelo.id).filter(Vuelo.estado == "cancelado")], semilla)
+                if cancelados:
+                    prueba.ejecutar(lambda g: g.actualizar_vuelo(aleatorio.choice(cancelados),
+                                                                 {"estado": "programado"}))
+            elif operacion < 0.8:
+                aleatorio.shuffle(ids)
+                try:
+                    prueba.ejecutar(lambda g: g.reordenar_cola(origen, orden=ids))
+                except ValueError:
+                    pass  # La cola cambió desde que se leyó
+            elif operacion < 0.9:
+                prueba.ejecutar(lambda g: g.reordenar_vuelos_por_retrasos(origen))
+            else:
+                # Un vuelo despegado hace días se archiva y se retira de las colas
+                antiguo = {"estado": "despegado", "hora_programada": datetime.now() - timedelta(days=5)}
+                prueba.ejecutar(lambda g: g.actualizar_vuelo(aleatorio.choice(propios), antiguo))
+                archivados = archivador.archivar_lote()
+                if archivados:
+                    prueba.ejecutar(lambda g: g.retirar_archivados(archivados))
+    except Exception as e:
+        prueba.errores.append(repr(e))
+
+
+def _lector(prueba):
+    versiones = {}
+    try:
+        while not prueba.detener.is_set():
+            for cola in prueba.colas.todas():
+                instantanea = cola.instantanea
+                if instantanea.version < versiones.get(cola.origen, -1):
+                    prueba.errores.append(f"La versión de la instantánea de {cola.origen} retrocedió")
+                versiones[cola.origen] = instantanea.version
+                ids = [vuelo.id for vuelo in instantanea.vuelos]
+                if len(set(ids)) != len(ids):
+                    prueba.errores.append(f"Vuelos repetidos en la instantánea de {cola.origen}")
+            # La vista global se recorre pero no se comprueba: un vuelo que cambia de origen
+            # mientras se toman las instantáneas puede aparecer dos veces (ver iterar_global)
+            prueba.colas.vista_global()
+    except Exception as e:
+        prueba.errores.append(repr(e))
+
+
+@pytest.mark.parametrize("agrupado", [False, True], ids=["directo", "agrupado"])
+def test_las_escrituras_concurrentes_conservan_las_invariantes_de_las_colas(fabrica_sesion, agrupado):
+    escritor = EscritorAgrupado(fabrica_sesion, espera_ms=2) if agrupado else None
+    prueba = _Prueba(fabrica_sesion, escritor)
+    prueba.ejecutar(lambda g: g.agregar_vuelos_en_lote([prueba.nuevo_vuelo(random.Random(i)) for i in range(30)]))
+
+    hilos = [threading.Thread(target=_escritor, args=(prueba, semilla)) for semilla in range(ESCRITORES)]
+    lectores = [threading.Thread(target=_lector, args=(prueba,)) for _ in range(LECTORES)]
+    for hilo in hilos + lectores:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    prueba.detener.set()
+    for hilo in lectores:
+        hilo.join()
+    if escritor is not None:
+        escritor.detener()
+
+    assert prueba.errores == []
+    en_colas = {}
+    for cola in prueba.colas.todas():
+        with cola.lock:
+            _verificar_lista(cola.lista)
+            assert [v.id for v in cola.lista.listar_todos()] == [v.id for v in cola.instantanea.vuelos]
+            assert not cola.reservas
+        rangos = [vuelo.posicion_cola for vuelo in cola.instantanea.vuelos]
+        assert rangos == sorted(set(rangos)), f"Rangos desordenados en la cola {cola.origen}"
+        for vuelo in cola.instantanea.vuelos:
+            en_colas[vuelo.id] = (cola.origen, vuelo.posicion_cola)
+
+    # Las colas contienen exactamente los vuelos no cancelados, con su origen y rango guardados
+    with fabrica_sesion() as sesion:
+        en_base_de_datos = {vuelo.id: (vuelo.origen, vuelo.posicion_cola)
+                            for vuelo in sesion.query(Vuelo).filter(Vuelo.estado != "cancelado")}
+    assert en_colas == en_base_de_datos
+
+    # Tras reiniciar se reconstruyen las mismas colas y los mismos contadores
+    recargado = GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen())
+    for origen in ORIGENES:
+        assert [v.id for v in recargado.obtener_todos_los_vuelos(origen)] == prueba.ids_en_cola(origen)
+    assert prueba.contadores.resumen() == recargado.contadores.resumen()
@@ -0,0 +1,73 @@
+import threading
+from datetime import datetime, timedelta
+
+from colas_vuelos import ColasPorOrigen
+from conftest import datos_vuelo
+from escritura_agrupada import EscritorAgrupado
+from estadisticas_vuelos import ContadoresVuelos
+from gestor_vuelos import GestorVuelos
+
+
+class _EscritorQueCuentaLotes(EscritorAgrupado):
+    """Escritor agrupado que anota el tamaño de cada lote que confirma"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lotes = []
+
+    def _procesar(self, lote):
+        self.lotes.append(len(lote))
+        super()._procesar(lote)
+
+
+def test_las_altas_de_un_mismo_origen_se_agrupan_y_conservan_el_orden(fabrica_sesion):
+    escritor = _EscritorQueCuentaLotes(fabrica_sesion, max_operaciones=64, espera_ms=20)
+    compartido = {"contadores": ContadoresVuelos(), "colas": ColasPorOrigen()}
+    errores = []
+
+    def cliente(inicio):
+        sesion = fabrica_sesion()
+        try:
+            gestor = GestorVuelos(sesion, escritor=escritor, **compartido)
+            for i in range(inicio, inicio + 5):
+                gestor.agregar_vuelo(datos_vuelo(i, es_emergencia=i % 7 == 0))
+        except Exception as e:
+            errores.append(e)
+        finally:
+            sesion.close()
+
+    GestorVuelos(fabrica_sesion(), escritor=escritor, **compartido)
+    clientes = [threading.Thread(target=cliente, args=(hilo * 5,)) for hilo in range(16)]
+    for hilo in clientes:
+        hilo.start()
+    for hilo in clientes:
+        hilo.join()
+    escritor.detener()
+
+    assert errores == []
+    # Con el bloqueo de la partición tomado mientras se espera el lote, nunca pasaría de 1
+    assert max(escritor.lotes) > 1
+    vuelos = compartido["colas"].obtener("SCL").instantanea.vuelos
+    assert len(vuelos) == 80
+    rangos = [vuelo.posicion_cola for vuelo in vuelos]
+    assert rangos == sorted(set(rangos))
+    recargado = GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen())
+    assert [v.id for v in recargado.obtener_todos_los_vuelos("SCL")] == [v.id for v in vuelos]
+
+
+def test_actualizar_un_vuelo_que_cambia_de_posicion_usa_una_sola_transaccion(fabrica_sesion):
+    escritor = _EscritorQueCuentaLotes(fabrica_sesion, espera_ms=0)
+    gestor = GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen(), escritor=escritor)
+    ids = [gestor.agregar_vuelo(datos_vuelo(i, horas=i + 1)).id for i in range(3)]
+    escritor.lotes.clear()
+
+    gestor.actualizar_vuelo(ids[0], {"origen": "LIM", "hora_programada": datetime.now() + timedelta(hours=9)})
+    gestor.actualizar_vuelo(ids[1], {"hora_programada": datetime.now() + timedelta(hours=9)})
+    escritor.detener()
+
+    assert escritor.lotes == [1, 1]
+    assert [v.id for v in gestor.obtener_todos_los_vuelos("SCL")] == [ids[2], ids[1]]
+    assert [v.id for v in gestor.obtener_todos_los_vuelos("LIM")] == [ids[0]]
+    recargado = GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen())
+    assert [v.id for v in recargado.obtener_todos_los_vuelos("SCL")] == [ids[2], ids[1]]
+    assert [v.id for v in recargado.obtener_todos_los_vuelos("LIM")] == [ids[0]]
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from conftest import datos_vuelo
+from estadisticas_vuelos import ContadoresVuelos, claves_vuelo
+
+
+def _vuelo(id_vuelo, **otros):
+    return SimpleNamespace(id=id_vuelo, **datos_vuelo(id_vuelo, **otros))
+
+
+def _claves(**otros):
+    return claves_vuelo(_vuelo(1, **otros))
+
+
+def test_una_lectura_anterior_no_pisa_a_una_posterior():
+    contadores = ContadoresVuelos()
+    contadores.registrar(_vuelo(1))
+
+    def leer_antigua():
+        # Mientras esta lectura está en curso (sin el bloqueo), otra modificación confirma
+        # y cuenta un estado posterior
+        contadores.actualizar(1, lambda: _claves(estado="retrasado"))
+        return _claves(estado="abordando")
+
+    contadores.actualizar(1, leer_antigua)
+
+    assert contadores.resumen()["por_estado"] == {"retrasado": 1}
+
+
+def test_una_lectura_anterior_no_vuelve_a_contar_un_vuelo_retirado():
+    contadores = ContadoresVuelos()
+    contadores.registrar_varios([_vuelo(1), _vuelo(2)])
+
+    def leer_antes_de_archivar():
+        contadores.retirar_varios([1])
+        return _claves(estado="despegado")
+
+    contadores.actualizar(1, leer_antes_de_archivar)
+    contadores.actualizar(2, lambda: None)
+
+    assert contadores.resumen()["total"] == 0
+
+
+def test_registrar_no_pisa_una_modificacion_ya_contada():
+    contadores = ContadoresVuelos()
+    vuelo = _vuelo(1)
+    # El vuelo se modificó y se recontó entre su alta y su registro
+    contadores.actualizar(1, lambda: _claves(estado="cancelado"))
+    contadores.registrar(vuelo)
+
+    assert contadores.resumen()["por_estado"] == {"cancelado": 1}
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from colas_vuelos import ColasPorOrigen
+from conftest import datos_vuelo
+from exportador_vuelos import exportar_vuelos, filtrar_vuelos, iterar_vuelos_db
+from modelos import Vuelo, inicializar_base_de_datos
+
+# Versión reducida de rendimiento/bench_exportacion.py: tamaños, margen entre picos y
+# vuelos leídos de la base de datos por bloque
+CANTIDADES = (1000, 10000)
+FACTOR_MAXIMO = 1.5
+TAMANIO_BLOQUE = 100
+
+ORIGENES = ("SCL", "LIM", "BCN")
+
+
+def _datos(indice):
+    return datos_vuelo(indice, origen=ORIGENES[indice % len(ORIGENES)], es_emergencia=indice % 50 == 0)
+
+
+def _iterar_db(fabrica_sesion, cantidad):
+    sesion = fabrica_sesion()
+    sesion.execute(insert(Vuelo), [_datos(i) for i in range(cantidad)])
+    sesion.commit()
+    sesion.close()
+    return lambda: iterar_vuelos_db({}, tamanio_bloque=TAMANIO_BLOQUE, fabrica_sesion=fabrica_sesion)
+
+
+def _iterar_cola(cantidad):
+    colas = ColasPorOrigen()
+    for indice in range(cantidad):
+        vuelo = SimpleNamespace(id=indice + 1, **_datos(indice))
+        colas.obtener(vuelo.origen, crear=True).lista.insertar_al_final(vuelo)
+    for cola in colas.todas():
+        cola.publicar()
+    # Igual que GET /vuelos/exportar?fuente=cola
+    return lambda: filtrar_vuelos(colas.iterar_global(), {})
+
+
+def _pico_exportacion(iterar_vuelos, formato, comprimir):
+    """Consume la exportación completa y retorna el pico de memoria"""
+    tracemalloc.start()
+    try:
+        fragmentos, _, _ = exportar_vuelos(iterar_vuelos(), formato, comprimir)
+        for _ in fragmentos:
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("fuente", ["db", "cola"])
+@pytest.mark.parametrize("formato, comprimir", [("ndjson", False), ("csv", True)])
+def test_el_pico_de_memoria_no_crece_con_el_numero_de_vuelos(tmp_path, fuente, formato, comprimir):
+    picos = []
+    motores = []
+    for cantidad in CANTIDADES:
+        if fuente == "db":
+            motor = create_engine(f"sqlite:///{tmp_path / f'vuelos_{cantidad}.db'}")
+            inicializar_base_de_datos(motor)
+            iterar = _iterar_db(sessionmaker(bind=motor), cantidad)
+            motores.append(motor)
+        else:
+            iterar = _iterar_cola(cantidad)
+        # Una primera pasada sin medir deja compiladas las consultas y cargados los módulos
+        _pico_exportacion(iterar, formato, comprimir)
+        picos.append(_pico_exportacion(iterar, formato, comprimir))
+
+    for motor in motores:
+        motor.dispose()
+
+    assert picos[1] <= picos[0] * FACTOR_MAXIMO, picos
+
+
+def _crear(cliente, indice, **otros):
+    datos = datos_vuelo(indice, **otros)
+    datos["hora_programada"] = datos["hora_programada"].isoformat()
+    respuesta = cliente.post("/vuelos/", json=datos)
+    assert respuesta.status_code == 201, respuesta.text
+    return respuesta.json()
+
+
+@pytest.fixture
+def cliente_con_vuelos(cliente):
+    _crear(cliente, 0, origen="SCL", horas=2)
+    _crear(cliente, 1, origen="LIM", aerolinea="IB", numero_vuelo="IB1001")
+    _crear(cliente, 2, origen="SCL", horas=1, estado="cancelado")
+    _crear(cliente, 3, origen="SCL", horas=3, es_emergencia=True)
+    return cliente
+
+
+def test_exportar_ndjson_con_sus_cabeceras(cliente_con_vuelos):
+    respuesta = cliente_con_vuelos.get("/vuelos/exportar")
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "application/x-ndjson"
+    assert respuesta.headers["content-disposition"] == 'attachment; filename="vuelos.ndjson"'
+    assert "content-encoding" not in respuesta.headers
+    vuelos = [json.loads(linea) for linea in respuesta.text.splitlines()]
+    # Orden de las colas (los cancelados no están en ellas)
+    assert [vuelo["numero_vuelo"] for vuelo in vuelos] == ["LA1003", "IB1001", "LA1000"]
+
+
+def test_exportar_csv_comprimido(cliente_con_vuelos):
+    respuesta = cliente_con_vuelos.get("/vuelos/exportar", params={"formato": "csv", "comprimir": True})
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "text/csv; charset=utf-8"
+    assert respuesta.headers["content-disposition"] == 'attachment; filename="vuelos.csv"'
+    assert respuesta.headers["content-encoding"] == "gzip"
+    # El cliente descomprime el cuerpo según Content-Encoding
+    filas = list(csv.DictReader(io.StringIO(respuesta.text)))
+    assert [fila["numero_vuelo"] for fila in filas] == ["LA1003", "IB1001", "LA1000"]
+    assert filas[0]["es_emergencia"] == "True"
+
+
+@pytest.mark.parametrize("parametros, esperados", [
+    ({"origen": "SCL"}, ["LA1003", "LA1000"]),
+    ({"aerolinea": "IB"}, ["IB1001"]),
+    ({"fuente": "db"}, ["LA1000", "IB1001", "LA1002", "LA1003"]),
+    ({"fuente": "db", "estado": "cancelado"}, ["LA1002"]),
+    ({"fuente": "db", "origen": "SCL", "destino": "MAD", "estado": "programado"}, ["LA1000", "LA1003"]),
+])
+def test_exportar_con_filtros(cliente_con_vuelos, parametros, esperados):
+    respuesta = cliente_con_vuelos.get("/vuelos/exportar", params=parametros)
+
+    assert respuesta.status_code == 200
+    assert [json.loads(linea)["numero_vuelo"] for linea in respuesta.text.splitlines()] == esperados
+
+
+def test_exportar_rechaza_formato_o_fuente_desconocidos(cliente):
+    assert cliente.get("/vuelos/exportar", params={"formato": "xml"}).status_code == 422
+    assert cliente.get("/vuelos/exportar", params={"fuente": "cache"}).status_code == 422
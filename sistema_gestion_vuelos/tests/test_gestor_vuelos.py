@@ -0,0 +1,23 @@
+from colas_vuelos import ColasPorOrigen
+from conftest import datos_vuelo
+from estadisticas_vuelos import ContadoresVuelos
+from gestor_vuelos import GestorVuelos
+
+
+def _numeros(vuelos):
+    return [vuelo.numero_vuelo for vuelo in vuelos]
+
+
+def test_los_filtros_incluyen_los_vuelos_cancelados(fabrica_sesion):
+    gestor = GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen())
+    gestor.agregar_vuelo(datos_vuelo(0))
+    gestor.agregar_vuelo(datos_vuelo(1, origen="LIM", estado="cancelado"))
+    cancelado = gestor.agregar_vuelo(datos_vuelo(2))
+    gestor.eliminar_vuelo_por_id(cancelado.id)
+
+    assert _numeros(gestor.obtener_vuelos_por_estado("cancelado")) == ["LA1001", "LA1002"]
+    assert _numeros(gestor.obtener_vuelos_por_estado("cancelado", "SCL")) == ["LA1002"]
+    assert _numeros(gestor.obtener_vuelos_por_estado("programado")) == ["LA1000"]
+    assert _numeros(gestor.obtener_vuelos_por_aerolinea("LA", "SCL")) == ["LA1000", "LA1002"]
+    assert _numeros(gestor.obtener_vuelos_por_origen_destino("LIM")) == ["LA1001"]
+    assert _numeros(gestor.obtener_vuelos_por_origen_destino(destino="MAD")) == ["LA1000", "LA1001", "LA1002"]
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from colas_vuelos import ColasPorOrigen
+from conftest import datos_vuelo
+from estadisticas_vuelos import ContadoresVuelos
+from gestor_vuelos import GestorVuelos
+from modelos import Vuelo
+
+
+def _gestor(fabrica_sesion):
+    """Gestor con colas recién cargadas de la base de datos, como tras reiniciar el proceso"""
+    return GestorVuelos(fabrica_sesion(), contadores=ContadoresVuelos(), colas=ColasPorOrigen())
+
+
+def _ids(gestor, origen="SCL"):
+    return [vuelo.id for vuelo in gestor.obtener_todos_los_vuelos(origen)]
+
+
+def test_el_orden_sobrevive_al_reinicio_tras_cualquier_cambio(fabrica_sesion):
+    gestor = _gestor(fabrica_sesion)
+    ids = [gestor.agregar_vuelo(datos_vuelo(i, horas=i + 1)).id for i in range(6)]
+
+    gestor.reordenar_cola("SCL", orden=list(reversed(ids)))
+    gestor.reordenar_cola("SCL", movimientos=[(ids[0], 0)])
+    gestor.insertar_vuelo_en_posicion(datos_vuelo(10), 0)
+    gestor.insertar_vuelo_en_posicion(datos_vuelo(11), 3)
+    gestor.agregar_vuelo(datos_vuelo(12, es_emergencia=True))
+    gestor.agregar_vuelo(datos_vuelo(13))
+    gestor.agregar_vuelos_en_lote([datos_vuelo(14), datos_vuelo(15, es_emergencia=True)])
+    gestor.actualizar_vuelo(ids[2], {"hora_programada": datetime.now() + timedelta(minutes=90)})
+    gestor.actualizar_vuelo(ids[3], {"estado": "retrasado"})
+    gestor.reordenar_vuelos_por_retrasos("SCL")
+    gestor.eliminar_vuelo_por_id(ids[4])
+
+    assert _ids(_gestor(fabrica_sesion), "SCL") == _ids(gestor, "SCL")
+
+
+def test_insertar_sin_hueco_entre_rangos_renumera_la_cola(fabrica_sesion):
+    gestor = _gestor(fabrica_sesion)
+    for i in range(2):
+        gestor.agregar_vuelo(datos_vuelo(i))
+    # Cada inserción en la posición 1 parte el hueco por la mitad hasta agotarlo
+    for i in range(2, 20):
+        gestor.insertar_vuelo_en_posicion(datos_vuelo(i), 1)
+
+    rangos = [vuelo.posicion_cola for vuelo in gestor.obtener_todos_los_vuelos("SCL")]
+    assert rangos == sorted(set(rangos))
+    assert _ids(_gestor(fabrica_sesion), "SCL") == _ids(gestor, "SCL")
+
+
+def test_vuelos_sin_rango_se_ordenan_y_se_renumeran_al_cargar(fabrica_sesion):
+    sesion = fabrica_sesion()
+    sesion.execute(insert(Vuelo), [
+        datos_vuelo(0, horas=3),
+        datos_vuelo(1, horas=1),
+        datos_vuelo(2, horas=2, es_emergencia=True),
+    ])
+    sesion.commit()
+
+    gestor = _gestor(fabrica_sesion)
+    assert [vuelo.numero_vuelo for vuelo in gestor.obtener_todos_los_vuelos("SCL")] == ["LA1002", "LA1001", "LA1000"]
+    assert all(vuelo.posicion_cola is not None for vuelo in fabrica_sesion().query(Vuelo))
+    assert _ids(_gestor(fabrica_sesion), "SCL") == _ids(gestor, "SCL")
+
+
+def test_primero_y_ultimo_globales_coinciden_con_la_vista_global(fabrica_sesion):
+    gestor = _gestor(fabrica_sesion)
+    # La cola de SCL queda en orden de llegada, no de hora
+    gestor.agregar_vuelo(datos_vuelo(0, horas=10))
+    gestor.agregar_vuelo(datos_vuelo(1, horas=1))
+    gestor.agregar_vuelo(datos_vuelo(2, origen="LIM", horas=5))
+
+    vista = [vuelo.numero_vuelo for vuelo in gestor.obtener_todos_los_vuelos()]
+    assert vista == ["LA1002", "LA1000", "LA1001"]
+    assert gestor.obtener_primer_vuelo().numero_vuelo == vista[0]
+    assert gestor.obtener_ultimo_vuelo().numero_vuelo == vista[-1]
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import datos_vuelo
+from validador_vuelos import (
+    MENSAJE_AEROLINEA_NO_REGISTRADA,
+    MENSAJE_AEROPUERTO_INVALIDO,
+    MENSAJE_AEROPUERTO_NO_REGISTRADO,
+    MENSAJE_ESTADO_INVALIDO,
+    MENSAJE_HORA_NO_DATETIME,
+    MENSAJE_HORA_PASADA,
+    MENSAJE_NUMERO_VUELO_DUPLICADO,
+    MENSAJE_NUMERO_VUELO_EXISTENTE,
+    MENSAJE_NUMERO_VUELO_INVALIDO,
+    MENSAJE_NUMERO_VUELO_NO_TEXTO,
+    MENSAJE_ORIGEN_IGUAL_DESTINO,
+    ValidadorVuelos,
+)
+
+
+@pytest.mark.parametrize("numero, valido", [
+    ("IB123", True), ("IB1234", True), ("IB12", False), ("IB12345", False), ("ib1234", False), ("I1234", False),
+])
+def test_validar_numero_vuelo(numero, valido):
+    assert ValidadorVuelos.validar_numero_vuelo(numero)[0] is valido
+
+
+def test_validar_numero_vuelo_que_no_es_texto():
+    assert ValidadorVuelos.validar_numero_vuelo(1234) == (False, MENSAJE_NUMERO_VUELO_NO_TEXTO)
+
+
+def test_validar_estado():
+    assert ValidadorVuelos.validar_estado("retrasado")[0]
+    assert ValidadorVuelos.validar_estado("perdido") == (False, MENSAJE_ESTADO_INVALIDO)
+
+
+def test_validar_hora_programada():
+    assert ValidadorVuelos.validar_hora_programada(datetime.now() - timedelta(minutes=10))[0]
+    assert ValidadorVuelos.validar_hora_programada(datetime.now() - timedelta(hours=1)) == (False, MENSAJE_HORA_PASADA)
+    assert ValidadorVuelos.validar_hora_programada("2030-01-01") == (False, MENSAJE_HORA_NO_DATETIME)
+
+
+def test_validar_origen_destino():
+    assert ValidadorVuelos.validar_origen_destino("MAD", "BCN")[0]
+    assert ValidadorVuelos.validar_origen_destino("MAD", "MAD") == (False, MENSAJE_ORIGEN_IGUAL_DESTINO)
+    assert ValidadorVuelos.validar_origen_destino("MAD", "bcn") == (
+        False, MENSAJE_AEROPUERTO_INVALIDO.format(campo="destino", ejemplo="BCN"))
+
+
+def test_validar_referencias_solo_comprueba_los_campos_presentes():
+    aeropuertos, aerolineas = {"MAD", "BCN"}, {"IB"}
+    assert ValidadorVuelos.validar_referencias({"destino": "BCN"}, aeropuertos, aerolineas) == (True, [])
+    assert ValidadorVuelos.validar_referencias({"origen": "SCL", "numero_vuelo": "LA1000"}, aeropuertos, aerolineas) == (
+        False, [MENSAJE_AEROPUERTO_NO_REGISTRADO.format(campo="origen", codigo="SCL"),
+                MENSAJE_AEROLINEA_NO_REGISTRADA.format(codigo="LA")])
+    # Sin datos de referencia cargados no se comprueba nada
+    assert ValidadorVuelos.validar_referencias({"origen": "SCL"}, set(), None) == (True, [])
+
+
+def test_validar_lote_sin_errores():
+    assert ValidadorVuelos.validar_lote([datos_vuelo(0), datos_vuelo(1)], {"SCL", "MAD"}, {"LA"}) == {}
+
+
+def test_validar_lote_reporta_los_errores_de_cada_fila():
+    registros = [
+        datos_vuelo(0),
+        datos_vuelo(0),
+        datos_vuelo(1, numero_vuelo="LA12"),
+        datos_vuelo(2, estado="perdido", hora_programada=datetime.now() - timedelta(days=1)),
+        datos_vuelo(3, destino="SCL"),
+        datos_vuelo(4, numero_vuelo="IB1004", origen="LIM"),
+        datos_vuelo(5),
+    ]
+
+    errores = ValidadorVuelos.validar_lote(registros, {"SCL", "MAD"}, {"LA"}, numeros_existentes={"LA1005"})
+
+    assert errores == {
+        1: [MENSAJE_NUMERO_VUELO_DUPLICADO.format(numero="LA1000")],
+        2: [MENSAJE_NUMERO_VUELO_INVALIDO],
+        3: [MENSAJE_ESTADO_INVALIDO, MENSAJE_HORA_PASADA],
+        4: [MENSAJE_ORIGEN_IGUAL_DESTINO],
+        5: [MENSAJE_AEROLINEA_NO_REGISTRADA.format(codigo="IB"),
+            MENSAJE_AEROPUERTO_NO_REGISTRADO.format(campo="origen", codigo="LIM")],
+        6: [MENSAJE_NUMERO_VUELO_EXISTENTE.format(numero="LA1005")],
+    }
+
+
+def test_validar_lote_coincide_con_la_validacion_individual():
+    registro = datos_vuelo(0, numero_vuelo=None, estado="perdido", hora_programada=None, origen="mad", destino="mad")
+    valido, errores = ValidadorVuelos.validar_vuelo_completo(registro)
+
+    assert not valido
+    assert ValidadorVuelos.validar_lote([registro])[0][:3] == errores[:3]
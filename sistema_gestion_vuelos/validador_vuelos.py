@@ -0,0 +1,222 @@
+import re
+from datetime import datetime, timedelta
+from configuracion import Configuracion
+
+# Patrones precompilados (se reutilizan en cada validación)
+PATRON_NUMERO_VUELO = re.compile(r'^[A-Z]{2}\d{3,4}$')
+PATRON_CODIGO_AEROPUERTO = re.compile(r'^[A-Z]{3}$')
+PATRON_CODIGO_AEROLINEA = re.compile(r'^[A-Z]{2}$')
+
+ESTADOS_VALIDOS = frozenset(Configuracion.ESTADOS_VUELO)
+
+# Mensajes de validación (los que llevan {campos} se completan con format)
+MENSAJE_NUMERO_VUELO_NO_TEXTO = "El número de vuelo debe ser una cadena de texto"
+MENSAJE_NUMERO_VUELO_INVALIDO = "Formato de número de vuelo inválido. Debe ser 2 letras mayúsculas seguidas de 3-4 números (ej: IB1234)"
+MENSAJE_NUMERO_VUELO_DUPLICADO = "Número de vuelo {numero} duplicado en el lote"
+MENSAJE_NUMERO_VUELO_EXISTENTE = "Ya existe un vuelo con el número {numero}"
+MENSAJE_NUMERO_VUELO_VALIDO = "Número de vuelo válido"
+MENSAJE_ESTADO_INVALIDO = f"Estado inválido. Debe ser uno de: {', '.join(Configuracion.ESTADOS_VUELO)}"
+MENSAJE_ESTADO_VALIDO = "Estado válido"
+MENSAJE_HORA_NO_DATETIME = "La hora programada debe ser un objeto datetime"
+MENSAJE_HORA_PASADA = "La hora programada no puede ser en el pasado"
+MENSAJE_HORA_VALIDA = "Hora programada válida"
+MENSAJE_AEROPUERTO_INVALIDO = "Código de {campo} inválido. Debe ser 3 letras mayúsculas (ej: {ejemplo})"
+MENSAJE_AEROPUERTO_VALIDO = "Código de {campo} válido"
+MENSAJE_AEROPUERTO_NO_REGISTRADO = "El aeropuerto de {campo} {codigo} no está registrado"
+MENSAJE_AEROLINEA_INVALIDA = "Código de aerolínea inválido. Debe ser 2 letras mayúsculas (ej: IB)"
+MENSAJE_AEROLINEA_VALIDA = "Código de aerolínea válido"
+MENSAJE_AEROLINEA_NO_REGISTRADA = "La aerolínea {codigo} no está registrada"
+MENSAJE_ORIGEN_IGUAL_DESTINO = "El origen y destino no pueden ser iguales"
+MENSAJE_ORIGEN_DESTINO_VALIDOS = "Origen y destino válidos"
+MENSAJE_VUELO_VALIDO = "Todos los datos del vuelo son válidos"
+
+
+class ValidadorVuelos:
+    """Clase para validar los datos de vuelos antes de procesarlos"""
+
+    @staticmethod
+    def validar_numero_vuelo(numero_vuelo):
+        """Valida el formato del número de vuelo (2 letras seguidas de 3-4 números)"""
+        if not isinstance(numero_vuelo, str):
+            return False, MENSAJE_NUMERO_VUELO_NO_TEXTO
+
+        if not PATRON_NUMERO_VUELO.match(numero_vuelo):
+            return False, MENSAJE_NUMERO_VUELO_INVALIDO
+
+        return True, MENSAJE_NUMERO_VUELO_VALIDO
+
+    @staticmethod
+    def validar_estado(estado):
+        """Valida que el estado del vuelo sea uno permitido"""
+        if estado not in ESTADOS_VALIDOS:
+            return False, MENSAJE_ESTADO_INVALIDO
+
+        return True, MENSAJE_ESTADO_VALIDO
+
+    @staticmethod
+    def validar_hora_programada(hora):
+        """Valida que la hora programada sea una fecha futura (o actual)"""
+        if not isinstance(hora, datetime):
+            return False, MENSAJE_HORA_NO_DATETIME
+
+        # Verificar que la hora no sea en el pasado (más de 30 minutos)
+        tiempo_minimo = datetime.now() - timedelta(minutes=30)
+        if hora < tiempo_minimo:
+            return False, MENSAJE_HORA_PASADA
+
+        return True, MENSAJE_HORA_VALIDA
+
+    @staticmethod
+    def validar_codigo_aeropuerto(codigo, campo="origen"):
+        """Valida el formato de un código de aeropuerto (3 letras mayúsculas)"""
+        if not isinstance(codigo, str) or not PATRON_CODIGO_AEROPUERTO.match(codigo):
+            ejemplo = "MAD" if campo == "origen" else "BCN"
+            return False, MENSAJE_AEROPUERTO_INVALIDO.format(campo=campo, ejemplo=ejemplo)
+
+        return True, MENSAJE_AEROPUERTO_VALIDO.format(campo=campo)
+
+    @staticmethod
+    def validar_codigo_aerolinea(codigo):
+        """Valida el formato de un código de aerolínea (2 letras mayúsculas)"""
+        if not isinstance(codigo, str) or not PATRON_CODIGO_AEROLINEA.match(codigo):
+            return False, MENSAJE_AEROLINEA_INVALIDA
+
+        return True, MENSAJE_AEROLINEA_VALIDA
+
+    @staticmethod
+    def validar_origen_destino(origen, destino):
+        """Valida que origen y destino sean diferentes y formatos válidos"""
+        if origen == destino:
+            return False, MENSAJE_ORIGEN_IGUAL_DESTINO
+
+        # Validar formato: códigos de aeropuerto (3 letras mayúsculas)
+        valido, mensaje = ValidadorVuelos.validar_codigo_aeropuerto(origen, "origen")
+        if not valido:
+            return False, mensaje
+
+        valido, mensaje = ValidadorVuelos.validar_codigo_aeropuerto(destino, "destino")
+        if not valido:
+            return False, mensaje
+
+        return True, MENSAJE_ORIGEN_DESTINO_VALIDOS
+
+    @staticmethod
+    def validar_referencias(datos_vuelo, codigos_aeropuerto=None, codigos_aerolinea=None):
+        """Comprueba origen/destino y el prefijo de aerolínea contra los datos de referencia.
+
+        Los códigos se reciben como conjuntos en memoria; si un conjunto es None o
+        está vacío (tabla de referencia sin cargar) esa comprobación se omite. Solo se
+        comprueban los campos presentes en datos_vuelo (actualizaciones parciales).
+        """
+        errores = []
+
+        if codigos_aeropuerto:
+            for campo in ("origen", "destino"):
+                if campo not in datos_vuelo:
+                    continue
+                codigo = datos_vuelo[campo]
+                if codigo not in codigos_aeropuerto:
+                    errores.append(MENSAJE_AEROPUERTO_NO_REGISTRADO.format(campo=campo, codigo=codigo))
+
+        if codigos_aerolinea and 'numero_vuelo' in datos_vuelo:
+            numero_vuelo = datos_vuelo.get('numero_vuelo')
+            prefijo = numero_vuelo[:2] if isinstance(numero_vuelo, str) else None
+            if prefijo not in codigos_aerolinea:
+                errores.append(MENSAJE_AEROLINEA_NO_REGISTRADA.format(codigo=prefijo))
+
+        return len(errores) == 0, errores
+
+    @staticmethod
+    def validar_vuelo_completo(datos_vuelo):
+        """Realiza todas las validaciones en los datos del vuelo"""
+        errores = []
+
+        # Validar número de vuelo
+        valido, mensaje = ValidadorVuelos.validar_numero_vuelo(datos_vuelo.get('numero_vuelo', ''))
+        if not valido:
+            errores.append(mensaje)
+
+        # Validar estado
+        valido, mensaje = ValidadorVuelos.validar_estado(datos_vuelo.get('estado', ''))
+        if not valido:
+            errores.append(mensaje)
+
+        # Validar hora programada
+        valido, mensaje = ValidadorVuelos.validar_hora_programada(datos_vuelo.get('hora_programada'))
+        if not valido:
+            errores.append(mensaje)
+
+        # Validar origen y destino
+        valido, mensaje = ValidadorVuelos.validar_origen_destino(
+            datos_vuelo.get('origen', ''),
+            datos_vuelo.get('destino', '')
+        )
+        if not valido:
+            errores.append(mensaje)
+
+        # Devolver resultado
+        if errores:
+            return False, errores
+        return True, [MENSAJE_VUELO_VALIDO]
+
+    @staticmethod
+    def validar_lote(registros, codigos_aeropuerto=None, codigos_aerolinea=None, numeros_existentes=None):
+        """Valida un lote de vuelos columna a columna.
+
+        Cada regla se aplica a una columna completa de una sola pasada, en lugar de
+        validar registro a registro. Retorna un diccionario {indice: [errores]} que
+        solo contiene las filas con algún error (vacío si el lote es válido).
+        """
+        errores = {}
+
+        def registrar(indice, mensaje):
+            errores.setdefault(indice, []).append(mensaje)
+
+        # Número de vuelo: formato, duplicados dentro del lote y contra la base de datos
+        coincide_numero = PATRON_NUMERO_VUELO.match
+        vistos = set()
+        existentes = numeros_existentes or ()
+        for indice, numero in enumerate([r.get('numero_vuelo') for r in registros]):
+            if not isinstance(numero, str):
+                registrar(indice, MENSAJE_NUMERO_VUELO_NO_TEXTO)
+                continue
+            if not coincide_numero(numero):
+                registrar(indice, MENSAJE_NUMERO_VUELO_INVALIDO)
+                continue
+            if numero in vistos:
+                registrar(indice, MENSAJE_NUMERO_VUELO_DUPLICADO.format(numero=numero))
+            elif numero in existentes:
+                registrar(indice, MENSAJE_NUMERO_VUELO_EXISTENTE.format(numero=numero))
+            vistos.add(numero)
+            if codigos_aerolinea and numero[:2] not in codigos_aerolinea:
+                registrar(indice, MENSAJE_AEROLINEA_NO_REGISTRADA.format(codigo=numero[:2]))
+
+        # Estado (los registros sin estado toman el valor por defecto "programado")
+        for indice, estado in enumerate([r.get('estado', "programado") for r in registros]):
+            if estado not in ESTADOS_VALIDOS:
+                registrar(indice, MENSAJE_ESTADO_INVALIDO)
+
+        # Hora programada
+        tiempo_minimo = datetime.now() - timedelta(minutes=30)
+        for indice, hora in enumerate([r.get('hora_programada') for r in registros]):
+            if not isinstance(hora, datetime):
+                registrar(indice, MENSAJE_HORA_NO_DATETIME)
+            elif hora < tiempo_minimo:
+                registrar(indice, MENSAJE_HORA_PASADA)
+
+        # Origen y destino: formato, igualdad y pertenencia a los aeropuertos registrados
+        coincide_aeropuerto = PATRON_CODIGO_AEROPUERTO.match
+        origenes = [r.get('origen') for r in registros]
+        destinos = [r.get('destino') for r in registros]
+        for campo, columna in (("origen", origenes), ("destino", destinos)):
+            for indice, codigo in enumerate(columna):
+                if not isinstance(codigo, str) or not coincide_aeropuerto(codigo):
+                    _, mensaje = ValidadorVuelos.validar_codigo_aeropuerto(codigo, campo)
+                    registrar(indice, mensaje)
+                elif codigos_aeropuerto and codigo not in codigos_aeropuerto:
+                    registrar(indice, MENSAJE_AEROPUERTO_NO_REGISTRADO.format(campo=campo, codigo=codigo))
+        for indice, (origen, destino) in enumerate(zip(origenes, destinos)):
+            if origen == destino:
+                registrar(indice, MENSAJE_ORIGEN_IGUAL_DESTINO)
+
+        return errores